@@ -66,88 +66,4 @@ class Track(Model):
     time_signature = column(DataType.INTEGER)
     valence = column(DataType.REAL)
 
-
-# @database(filename="smrtypntz.db")
-# class _MusicDb(AbstractDbHandler):
-#
-#     # todo: crud methods for music data
-#
-#     # def _init_tables(self) -> bool:
-#     #     success = True
-#     #     if self._table_exists("artists") is False:
-#     #         success = success and self._create_table_artists()
-#     #     if self._table_exists("albums") is False:
-#     #         success = success and self._create_table_albums()
-#     #     if self._table_exists("tracks") is False:
-#     #         success = success and self._create_table_tracks()
-#     #     return success
-#
-#     def _create_table_artists(self) -> bool:
-#         return self._exec_raw_query_no_result('''CREATE TABLE "artists" (
-#                 "id" INTEGER PRIMARY KEY AUTOINCREMENT UNIQUE,
-#                 "spotify_id" TEXT,
-#                 "name" TEXT,
-#                 "spotify_genres" TEXT,
-#                 "spotify_popularity" INTEGER
-#             )''') and self._exec_raw_query_no_result('''CREATE UNIQUE INDEX "artist_names" ON "artists" ("name");''')
-#
-#     def _create_table_albums(self) -> bool:
-#         return self._exec_raw_query_no_result('''CREATE TABLE "albums" (
-#                     "id" INTEGER PRIMARY KEY AUTOINCREMENT,
-#                     "spotify_id" TEXT,
-#                     "name" TEXT,
-#                     "year" INTEGER,
-#                     "genres" TEXT,
-#                     "artist_id" INTEGER REFERENCES "artists"("id"),
-#                     "spotify_genres" TEXT
-#                 )''') and self._exec_raw_query_no_result('''CREATE UNIQUE INDEX "artist-name-year"
-#                                                   ON "albums" ("name","year","artist_id");''')
-#
-#     def _create_table_tracks(self) -> bool:
-#         return self._exec_raw_query_no_result('''CREATE TABLE "tracks" (
-#                 "id" INTEGER PRIMARY KEY AUTOINCREMENT,
-#                 "spotify_id" TEXT,
-#                 "filepath" TEXT,
-#                 "name" TEXT,
-#                 "duration" INTEGER,
-#                 "artist_id" INTEGER REFERENCES "artists"("id"),
-#                 "album_artist_id" INTEGER REFERENCES "artists"("id"),
-#                 "album_id" INTEGER REFERENCES "albums"("id"),
-#                 "album_track_number" INTEGER,
-#                 "danceability" REAL,
-#                 "energy" REAL,
-#                 "instrumentalness" REAL,
-#                 "key" INTEGER,
-#                 "liveness" REAL,
-#                 "loudness" REAL,
-#                 "mode" INTEGER,
-#                 "speechiness" REAL,
-#                 "tempo" REAL,
-#                 "time_signature" INTEGER,
-#                 "valence" REAL
-#             )''')
-#
-#     def get_all_artists(self) -> List[Artist]:
-#         query = SelectQueryBuilder('artists')
-#         rows = self.exec_query_all_results(query)
-#         # TODO: Deserialize the results into Artist objects
-#
-#     def get_all_albums(self) -> List[Album]:
-#         query = SelectQueryBuilder('albums')
-#         rows = self.exec_query_all_results(query)
-#         # TODO: Deserialize the results into Album objects
-#
-#     def get_all_tracks(self) -> List[Track]:
-#         query = SelectQueryBuilder('tracks')
-#         rows = self.exec_query_all_results(query)
-#         # TODO: Deserialize the results into Track objects
-#
-#
-# # Singleton instance of the db handler
-# db = _MusicDb()
-
-# artist = Artist.from_dict({"name": 1})
-# album = Album.from_dict({"name": "cool"})
-# album['abc'] = 123
-
-# print(str(artist))
+    track_filepaths = TableIndex([IndexedColumn(filepath)], index_name='tracks_filepath_idx', if_not_exists=True)
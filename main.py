@@ -2,57 +2,139 @@ import logging
 import json
 import os
 import taglib
-from example_database import db
+from concurrent.futures import ProcessPoolExecutor
+from itertools import batched
+from example_database import SmrtyPntz, Artist, Album, Track
+from squeeb.query import SelectQueryBuilder, where
 # import spotipy
 import sys
 
 
-# Init logger
-logging.basicConfig(
-    stream=sys.stderr,
-    level=logging.DEBUG,
-    format="%(asctime)-15s %(levelname)s - %(filename)s:%(funcName)s:%(lineno)s\n  %(message)s"
-)
-logger = logging.getLogger()
-
-
-# Init database
-db.init_tables()
-
-# Load program config, bail if missing.
-config = None
-with open('config.json') as cfgFile:
-    config = json.load(cfgFile)
-if config is None:
-    exit(-1)
-
-# Make list of files to scan
-files = []
-try:
-    for root, directories, files in os.walk(config.music_dir):
-        for name in files:
-            if name.endswith('.flac'):
-                files.push(os.path.join(root, name))
-except OSError or EOFError as e:
-    print(e)
-
-# Scan ID3 tags into sqlite
-artists = {}
-cur_artist = None
-albums = {}
-cur_album = None
-for filename in files:
+FLAC_EXTENSIONS = ('.flac', '.FLAC')
+# Number of parsed files written per transaction.
+BATCH_SIZE = 1000
+TRACK_COLUMNS = ('filepath', 'name', 'duration', 'album_track_number', 'artist_id', 'album_artist_id', 'album_id')
+
+
+def first_tag(tags, key):
+    values = tags.get(key)
+    return values[0] if values else None
+
+
+def parse_year(date):
+    return int(date[:4]) if date is not None and date[:4].isdigit() else None
+
+
+def extract_tags(filename):
+    """Reads one file's tags into (artist names, album key, track row) tuples, each aligned with its table's columns."""
     song = taglib.File(filename)
-    artist = db.Artist(song)
-    if artist.needs_split():
-        album_artist = artist.split()
-        if artist != album_artist:
-            pass
-    album = db.Album(song)
-    track = db.Track(song)
-    print(song.tags)
-    print(song.length)
-    print(song.bitrate)
-    print(song.sampleRate)
-    print(song.channels)
-    song.close()
+    try:
+        tags = song.tags
+        artist_name = first_tag(tags, 'ARTIST')
+        album_artist_name = first_tag(tags, 'ALBUMARTIST') or artist_name
+        return (
+            (artist_name, album_artist_name),
+            (first_tag(tags, 'ALBUM'), parse_year(first_tag(tags, 'DATE')), album_artist_name),
+            (filename, first_tag(tags, 'TITLE'), song.length, first_tag(tags, 'TRACKNUMBER')),
+        )
+    finally:
+        song.close()
+
+
+def iter_flacs(root):
+    """Yields the path of every FLAC file below `root`, using the type info scandir already read with the directory."""
+    try:
+        entries = list(os.scandir(root))
+    except OSError as e:
+        logging.error(e)
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from iter_flacs(entry.path)
+        elif entry.name.endswith(FLAC_EXTENSIONS):
+            yield entry.path
+
+
+def load_ids(db, model, key_columns, where_condition=None):
+    query = SelectQueryBuilder(model.__table_name__, dict.fromkeys(('id',) + key_columns), where_condition)
+    # Columns come back in selection order, so the key is sliced off positionally instead of looked up by name.
+    return {tuple(row)[1:]: row[0] for row in db.exec_query_all_results(query).rows}
+
+
+def insert_missing(db, model, rows, ids, key_columns):
+    """
+    Bulk inserts the rows whose key has no cached id yet, then caches the ids SQLite assigned to them. Raises the
+    insert's error if it fails, since every row after it depends on those ids.
+    """
+    missing = [row for key, row in rows.items() if key not in ids]
+    if len(missing) == 0:
+        return
+    last_id = max(ids.values(), default=0)
+    result = model.bulk_insert(missing)
+    if result.error is not None:
+        raise result.error
+    ids.update(load_ids(db, model, key_columns, where('id').greater_than(last_id)))
+
+
+def write_batch(db, batch, artist_ids, album_ids):
+    """
+    Writes one batch of parsed files in a single transaction: new artists first, then new albums, then the tracks, so
+    foreign key ids are known for the rows after them.
+    """
+    with db.transaction():
+        artist_names = dict.fromkeys(name for names, _, _ in batch for name in names)
+        insert_missing(db, Artist, {(name,): {'name': name} for name in artist_names}, artist_ids, ('name',))
+
+        album_keys = dict.fromkeys((name, year, artist_ids[(artist_name,)])
+                                   for _, (name, year, artist_name), _ in batch)
+        insert_missing(db, Album, {key: dict(zip(('name', 'year', 'artist_id'), key)) for key in album_keys},
+                       album_ids, ('name', 'year', 'artist_id'))
+
+        track_dicts = []
+        for (artist_name, album_artist_name), (album_name, year, _), track_row in batch:
+            album_artist_id = artist_ids[(album_artist_name,)]
+            track_dicts.append(dict(zip(TRACK_COLUMNS, track_row + (
+                artist_ids[(artist_name,)], album_artist_id, album_ids[(album_name, year, album_artist_id)]))))
+        result = Track.bulk_insert(track_dicts)
+        if result.error is not None:
+            raise result.error
+
+
+def main():
+    # Init logger
+    logging.basicConfig(
+        stream=sys.stderr,
+        level=logging.DEBUG,
+        format="%(asctime)-15s %(levelname)s - %(filename)s:%(funcName)s:%(lineno)s\n  %(message)s"
+    )
+
+    # Init database
+    db = SmrtyPntz()
+
+    # Load program config, bail if missing.
+    config = None
+    with open('config.json') as cfgFile:
+        config = json.load(cfgFile)
+    if config is None:
+        exit(-1)
+
+    # Skip files that were ingested by a previous run, so a rescan only pays for new files.
+    query = SelectQueryBuilder(Track.__table_name__, {'filepath': None})
+    seen = frozenset(row['filepath'] for row in db.exec_query_all_results(query).rows)
+    files = (filename for filename in iter_flacs(config['music_dir']) if filename not in seen)
+
+    # Files are parsed across processes a batch at a time, and only this one writes each batch once it is parsed. Memory
+    # stays bounded by the batch size, and the batches written so far persist if the run stops partway. Known artist and
+    # album ids are cached, so lookups for already-seen names never leave the process. That cache also guarantees
+    # uniqueness, which lets the indexes be dropped during the load and rebuilt once afterwards.
+    artist_ids = load_ids(db, Artist, ('name',))
+    album_ids = load_ids(db, Album, ('name', 'year', 'artist_id'))
+    with db.bulk_load_mode(), ProcessPoolExecutor() as executor:
+        for filenames in batched(files, BATCH_SIZE):
+            write_batch(db, list(executor.map(extract_tags, filenames, chunksize=64)), artist_ids, album_ids)
+
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,3 @@
-from .db import AbstractDbHandler
+from .db import Database, DatabaseManager, make_database_class
 from .query import QueryCondition, QueryConditionError, MutableQueryCondition, InsertQueryBuilder, SelectQueryBuilder, \
     UpdateQueryBuilder, DeleteQueryBuilder, where
@@ -8,3 +8,7 @@ class Order(StrEnum):
 
 
 ValueMapping = Dict[str, Any]
+
+
+# SQLite's default upper bound on bound parameters in a single statement (SQLITE_MAX_VARIABLE_NUMBER).
+SQLITE_MAX_VARIABLES = 999
@@ -1,14 +1,23 @@
 from __future__ import annotations
 
 import logging
+import os
+import queue
 import sqlite3
-from contextlib import closing
+import threading
+import weakref
+from contextlib import contextmanager
+from functools import partialmethod
 from dataclasses import dataclass
-from typing import List, Type, Tuple, Any, ClassVar
+from enum import IntEnum
+from typing import List, Type, Tuple, Any, ClassVar, Dict, Iterable, Set, Iterator, TYPE_CHECKING
 
-from .model.models import _sort_models, Model, _validate_foreign_keys
-from .query.queries import QueryBuilder, SelectQueryBuilder
-from .util import Singleton, camel_to_snake_case
+from .query.queries import QueryBuilder, SelectQueryBuilder, BeginTransactionQueryBuilder, CommitQueryBuilder, \
+    RollbackQueryBuilder, TransactionBehavior, PragmaQueryBuilder, SavepointQueryBuilder, ReleaseQueryBuilder
+from .util import Singleton, camel_to_snake_case, LRUCache
+
+if TYPE_CHECKING:
+    from .model.models import Model, ModelList
 
 
 class BaseDbHandlerResult:
@@ -16,13 +25,14 @@ class BaseDbHandlerResult:
 
     @property
     def success(self):
-        return self.error is not None
+        return self.error is None
 
 
 @dataclass(frozen=True)
 class DbHandlerNoResult(BaseDbHandlerResult):
     rowcount: int = 0
     error: sqlite3.Error = None
+    lastrowid: int = None
 
 
 @dataclass(frozen=True)
@@ -41,107 +51,513 @@ class DbHandlerMultiResult(BaseDbHandlerResult):
         return len(self.rows) if self.rows is not None else 0
 
 
-logger = logging.getLogger()
+class _FetchMode(IntEnum):
+    NONE = 0
+    ONE = 1
+    ALL = 2
+
+
+# Result types indexed by fetch mode.
+_RESULT_TYPES = (DbHandlerNoResult, DbHandlerSingleResult, DbHandlerMultiResult)
+
+logger = logging.getLogger(__name__)
+
+
+# Statements starting with one of these are plain reads that may be sent to a reader connection.
+_SELECT_PREFIXES = ('SELECT', 'select')
+
+
+def _log_query_error(error: sqlite3.Error, query_str: str) -> None:
+    # UNIQUE violations are an expected outcome when inserting rows that may already exist, so they are only logged at
+    # debug level. The error is still returned to the caller either way.
+    if getattr(error, 'sqlite_errorcode', None) == sqlite3.SQLITE_CONSTRAINT_UNIQUE:
+        logger.debug('Query failed: %s\n  %s', error, query_str)
+    else:
+        logger.error('Query failed: %s\n  %s', error, query_str)
+
+
+@dataclass
+class _PooledConnection:
+    conn: sqlite3.Connection
+    # Cursors keyed by SQL text, reused so repeated statements skip cursor setup and hit the compiled statement.
+    stmt_cache: LRUCache[str, sqlite3.Cursor]
+    # Executions of statements that have not been admitted to `stmt_cache` yet.
+    stmt_counts: LRUCache[str, int]
+    transaction_depth: int = 0
+
+    def close(self) -> None:
+        for cursor in self.stmt_cache.values():
+            cursor.close()
+        self.stmt_cache.clear()
+        self.conn.close()
+
+
+class _ThreadToken:
+    """Stored in a thread's local data next to its connection. It is collected when the thread exits."""
+    __slots__ = ('__weakref__',)
+
+
+class _ConnectionPool:
+    """
+    Holds one read-write connection per thread, opened on the thread's first query and closed when the thread exits,
+    and up to `readers` query_only connections lent out to any thread for the duration of a single read. With WAL
+    enabled, readers neither block the writers nor each other.
+    """
+
+    def __init__(self, file_path: str, pragmas: Dict[str, Any], statement_cache_size: int, readers: int) -> None:
+        self._file_path = file_path
+        self._uri = False
+        self._pragmas = pragmas
+        self._statement_cache_size = statement_cache_size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[_PooledConnection] = []
+        # Every plain ':memory:' connection opens a separate, empty database. Instead, the threads' connections share one
+        # named in-memory database, which is only read through writers. The anchor connection keeps it alive while
+        # threads come and go, since it is dropped once its last connection closes.
+        self._max_readers = readers if file_path != ':memory:' else 0
+        self._anchor: _PooledConnection | None = None
+        if file_path == ':memory:':
+            self._file_path = f'file:squeeb-{id(self)}?mode=memory&cache=shared'
+            self._uri = True
+            self._anchor = self._connect()
+            self._connections.append(self._anchor)
+        self._reader_count = 0
+        self._readers: queue.LifoQueue[_PooledConnection] = queue.LifoQueue()
+
+    @property
+    def has_readers(self) -> bool:
+        return self._max_readers > 0
+
+    def in_transaction(self) -> bool:
+        """Whether the calling thread's connection has a transaction open, without opening a connection if it has none."""
+        connection = getattr(self._local, 'connection', None)
+        return connection is not None and connection.transaction_depth > 0
+
+    @contextmanager
+    def reader(self) -> Iterator[_PooledConnection]:
+        """
+        Lends out an idle reader connection, opening a new one while the pool is below its limit and otherwise waiting
+        for one to be returned.
+        """
+        try:
+            connection = self._readers.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._reader_count < self._max_readers
+                if can_open:
+                    self._reader_count += 1
+            connection = self._open_reader() if can_open else self._readers.get()
+        try:
+            yield connection
+        finally:
+            self._readers.put(connection)
+
+    def _open_reader(self) -> _PooledConnection:
+        connection = self._connect()
+        connection.conn.execute(PragmaQueryBuilder('query_only', value=1).build().query).fetchall()
+        with self._lock:
+            self._connections.append(connection)
+        return connection
+
+    def get(self) -> _PooledConnection:
+        """Returns the calling thread's connection, opening it first if needed."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+            with self._lock:
+                self._connections.append(connection)
+            # A thread's local data is cleared when it exits, so the token's finalizer closes the connection then rather
+            # than leaving it open until `close()`.
+            self._local.token = _ThreadToken()
+            weakref.finalize(self._local.token, self._release, connection)
+        return connection
+
+    def _release(self, connection: _PooledConnection) -> None:
+        with self._lock:
+            # Compared by identity, since the pooled connection dataclass compares by value.
+            remaining = [pooled for pooled in self._connections if pooled is not connection]
+            if len(remaining) == len(self._connections):
+                # Already closed by `close()`.
+                return
+            self._connections = remaining
+        connection.close()
+
+    def _connect(self) -> _PooledConnection:
+        # Transactions are driven explicitly through `Database.transaction()` rather than by sqlite3's implicit BEGINs.
+        # Each connection is only used by its own thread, but the thread check is skipped so `close()` can close them all.
+        conn = sqlite3.connect(self._file_path, isolation_level=None, check_same_thread=False,
+                               cached_statements=self._statement_cache_size, uri=self._uri)
+        conn.row_factory = sqlite3.Row
+        conn.set_trace_callback(None)
+        for command, value in self._pragmas.items():
+            conn.execute(PragmaQueryBuilder(command, value=value).build().query).fetchall()
+        # The cursor cache is bounded to the size of sqlite3's own statement cache; evicted cursors are closed.
+        return _PooledConnection(conn, LRUCache(self._statement_cache_size, on_evict=sqlite3.Cursor.close),
+                                 LRUCache(self._statement_cache_size * 4))
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._reader_count = 0
+            self._readers = queue.LifoQueue()
+        self._local = threading.local()
+        for connection in connections:
+            connection.close()
 
 
 class Database(metaclass=Singleton):
-    # _conn = None
     __tables__: ClassVar[List[Type[Model]]] = []
+    # `__tables__` validated and sorted so referenced tables come first. Computed once per class and reset whenever a
+    # table is registered.
+    __sorted_tables__: ClassVar[List[Type[Model]] | None] = None
+    # Applied to every connection when it is opened. WAL with synchronous=NORMAL syncs on checkpoint rather than on
+    # every commit: a power loss may drop the most recent commits, but the database file cannot be corrupted.
+    __pragmas__: ClassVar[Dict[str, Any]] = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -65536,
+        'temp_store': 'MEMORY',
+        'mmap_size': 268435456,
+        'foreign_keys': 'ON',
+    }
+
+    __statement_cache_size__: ClassVar[int] = 512
+    # Read-only connections shared by all threads for SELECT statements run outside a transaction.
+    __reader_connections__: ClassVar[int] = os.cpu_count() or 1
+    # Executions after which a statement is given a long-lived cursor.
+    __cursor_cache_threshold__: ClassVar[int] = 8
 
     def __init__(self, file_path: str = None, version: int = 0):
         if file_path is None:
             file_path = f'{self.__class__.__name__}.db'
-        # Open database or create if not exists.
-        self._conn = sqlite3.connect(file_path)
-        self._conn.row_factory = sqlite3.Row
+        # Open database or create if not exists. Each thread gets its own connection from the pool.
+        self._pool: _ConnectionPool | None = _ConnectionPool(file_path, self.__pragmas__, self.__statement_cache_size__,
+                                                             self.__reader_connections__)
+        # Closes the pooled connections if the handler is collected or the interpreter exits without `close()`.
+        self._finalizer = weakref.finalize(self, self._pool.close)
+        # With SQUEEB_EXPLAIN set, each distinct statement's plan is checked once for full table scans.
+        self._explained: Set[str] | None = set() if os.environ.get('SQUEEB_EXPLAIN') else None
+        # Set while `bulk_load_mode()` has the indexes dropped. Model saves check it to skip the upsert, whose ON CONFLICT
+        # target is one of those indexes.
+        self._bulk_loading = False
         # Create tables if they do not exist.
         self._init_tables()
 
-    def __del__(self):
+    def __enter__(self) -> Database:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
         self.close()
 
     @classmethod
     def register_table(cls, table_model: Type[Model]):
-        cls.__tables__.append(table_model) if table_model not in cls.__tables__ else None
+        # Each database class keeps a list of its own instead of appending to the one inherited from its base.
+        if '__tables__' not in cls.__dict__:
+            cls.__tables__ = []
+        if table_model not in cls.__tables__:
+            cls.__tables__.append(table_model)
+            cls.__sorted_tables__ = None
+
+    @classmethod
+    def _sorted_tables(cls) -> List[Type[Model]]:
+        if cls.__dict__.get('__sorted_tables__') is None:
+            from .model.models import _sort_models
+            cls.__sorted_tables__ = _sort_models(cls.__tables__)
+        return cls.__sorted_tables__
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        return self._pool.get().conn
 
     def _init_tables(self):
-        _validate_foreign_keys(self)
-        models = _sort_models(self.__tables__)
-        for model in models:
-            success = model.init_table()
+        if self.__class__.__dict__.get('__sorted_tables__') is None:
+            # The model layer is only needed once tables are set up, so importing db.py does not pull it in.
+            from .model.models import _validate_foreign_keys
+            _validate_foreign_keys(self)
+        for model in self._sorted_tables():
+            success = model.init_table(self)
             if not success:
                 return False
         return True
 
-    def _exec_raw_query_no_result(self, query_str: str, args: Any = None) -> DbHandlerNoResult:
+    def _explain(self, query_str: str, args: Any) -> None:
+        if query_str in self._explained:
+            return
+        self._explained.add(query_str)
         try:
-            with closing(self._conn.cursor()) as c:
+            plan = self._conn.execute(f'EXPLAIN QUERY PLAN {query_str}', args if args is not None else ()).fetchall()
+        except sqlite3.Error:
+            return
+        for row in plan:
+            if 'SCAN ' in row['detail']:
+                logger.warning('Full scan (%s) in query: %s', row['detail'], query_str)
+
+    def _prepared(self, connection: _PooledConnection, query_str: str) -> sqlite3.Cursor | None:
+        """
+        Returns the long-lived cursor of a recurring statement, or None if the statement should run on the transient
+        cursor `Connection.execute` creates.
+        """
+        cursor = connection.stmt_cache.get(query_str)
+        if cursor is None:
+            # Only statements that keep recurring are admitted, so one-off statements cannot evict the hot ones.
+            count = connection.stmt_counts.pop(query_str, 0) + 1
+            if count >= self.__cursor_cache_threshold__:
+                cursor = connection.stmt_cache[query_str] = connection.conn.cursor()
+            else:
+                connection.stmt_counts[query_str] = count
+        return cursor
+
+    def _exec_raw(self, query_str: str, args: Any, mode: _FetchMode) -> BaseDbHandlerResult:
+        # Reads outside a transaction go to a shared reader. Inside one they must see its uncommitted writes, so they
+        # stay on the thread's own connection like every other statement.
+        if mode is not _FetchMode.NONE and self._pool.has_readers and query_str.startswith(_SELECT_PREFIXES) \
+                and not self._pool.in_transaction():
+            with self._pool.reader() as connection:
+                return self._exec_on(connection, query_str, args, mode)
+        return self._exec_on(self._pool.get(), query_str, args, mode)
+
+    def _exec_on(self, connection: _PooledConnection, query_str: str, args: Any,
+                 mode: _FetchMode) -> BaseDbHandlerResult:
+        try:
+            if self._explained is not None:
+                self._explain(query_str, args)
+            c = self._prepared(connection, query_str)
+            if c is None:
+                c = connection.conn.execute(query_str, args if args is not None else ())
+            else:
                 c.execute(query_str, args if args is not None else ())
-                return DbHandlerNoResult(c.rowcount)
+            if mode is _FetchMode.NONE:
+                return DbHandlerNoResult(c.rowcount, lastrowid=c.lastrowid)
+            elif mode is _FetchMode.ONE:
+                row = c.fetchone()
+                # Drain any remaining rows so the cached statement is reset rather than left holding a read lock.
+                c.fetchall()
+                return DbHandlerSingleResult(row)
+            else:
+                return DbHandlerMultiResult(c.fetchall())
         except sqlite3.Error as e:
-            logger.error(e)
-            return DbHandlerNoResult(error=e)
+            _log_query_error(e, query_str)
+            return _RESULT_TYPES[mode](error=e)
+
+    def _exec(self, query_builder: QueryBuilder, mode: _FetchMode) -> BaseDbHandlerResult:
+        query = query_builder.build()
+        if query.error is not None:
+            logger.error('QUERY BUILD ERROR: %s', query.error)
+            return _RESULT_TYPES[mode](error=query.error)
+        return self._exec_raw(query.query, query.args, mode)
+
+    def _exec_raw_query_no_result(self, query_str: str, args: Any = None) -> DbHandlerNoResult:
+        return self._exec_raw(query_str, args, _FetchMode.NONE)
 
     def _exec_raw_query_single_result(self, query_str: str, args: Any = None) -> DbHandlerSingleResult:
-        try:
-            with closing(self._conn.cursor()) as c:
-                c.execute(query_str, args if args is not None else ())
-                return DbHandlerSingleResult(c.fetchone())
-        except sqlite3.Error as e:
-            logger.error(e)
-            return DbHandlerSingleResult(error=e)
+        return self._exec_raw(query_str, args, _FetchMode.ONE)
 
     def _exec_raw_query_all_results(self, query_str: str, args: Tuple[Any] = None) -> DbHandlerMultiResult:
+        return self._exec_raw(query_str, args, _FetchMode.ALL)
+
+    def _exec_raw_many_no_result(self, query_str: str, args_iter: Iterable[Any]) -> DbHandlerNoResult:
         try:
-            with closing(self._conn.cursor()) as c:
-                c.execute(query_str, args if args is not None else ())
-                return DbHandlerMultiResult(c.fetchall())
+            connection = self._pool.get()
+            c = self._prepared(connection, query_str)
+            # The iterable is consumed lazily by sqlite3, so callers can stream parameters without materializing them.
+            if c is None:
+                c = connection.conn.executemany(query_str, args_iter)
+            else:
+                c.executemany(query_str, args_iter)
+            return DbHandlerNoResult(c.rowcount)
         except sqlite3.Error as e:
-            logger.error(e)
-            return DbHandlerMultiResult(error=e)
+            _log_query_error(e, query_str)
+            return DbHandlerNoResult(error=e)
 
-    def exec_query_no_result(self, query_builder: QueryBuilder) -> DbHandlerNoResult:
+    def _iter_raw_query(self, query_str: str, args: Any = None, chunk: int = 1000) -> Iterator[List[sqlite3.Row]]:
+        # A cached cursor could be re-executed by another query while this one is still being read, so the generator
+        # owns a cursor of its own.
+        c = self._conn.cursor()
+        try:
+            c.arraysize = chunk
+            c.execute(query_str, args if args is not None else ())
+            yield from iter(c.fetchmany, [])
+        finally:
+            c.close()
+
+    def iter_query(self, query_builder: QueryBuilder, chunk: int = 1000) -> Iterator[List[sqlite3.Row]]:
+        """
+        Runs a query and yields its result rows in lists of up to `chunk` rows, so a large result set never has to be
+        held in memory at once. Errors are raised rather than returned as results.
+        :param query_builder: The query to run.
+        :param chunk: The number of rows fetched per batch.
+        """
         query = query_builder.build()
-        if 'error' in query:
-            logger.error('QUERY BUILD ERROR: %s', query.error)
-            return DbHandlerNoResult(error=query.error)
-        return self._exec_raw_query_no_result(query.query, query.args)
+        if query.error is not None:
+            raise sqlite3.ProgrammingError(query.error)
+        return self._iter_raw_query(query.query, query.args, chunk)
+
+    def exec_query_no_result(self, query_builder: QueryBuilder) -> DbHandlerNoResult:
+        return self._exec(query_builder, _FetchMode.NONE)
 
     def exec_query_single_result(self, query_builder: QueryBuilder) -> DbHandlerSingleResult:
-        query = query_builder.build()
-        if 'error' in query:
-            logger.error('QUERY BUILD ERROR: %s', query.error)
-            return DbHandlerSingleResult(error=query.error)
-        return self._exec_raw_query_single_result(query.query, query.args)
+        return self._exec(query_builder, _FetchMode.ONE)
 
     def exec_query_all_results(self, query_builder: QueryBuilder) -> DbHandlerMultiResult:
-        query = query_builder.build()
-        if 'error' in query:
-            logger.error('QUERY BUILD ERROR: %s', query.error)
-            return DbHandlerMultiResult(error=query.error)
-        return self._exec_raw_query_all_results(query.query, query.args)
+        return self._exec(query_builder, _FetchMode.ALL)
 
-    def exec_many_no_result(self, query_builder: QueryBuilder) -> List[DbHandlerNoResult]:
-        pass
+    def _exec_many(self, query_builder: QueryBuilder, mode: _FetchMode) -> List[BaseDbHandlerResult]:
+        query = query_builder.build_many()
+        if query.error is not None:
+            logger.error('QUERY BUILD ERROR: %s', query.error)
+            return [_RESULT_TYPES[mode](error=query.error)]
+        results = []
+        try:
+            with self.transaction():
+                for args in query.args:
+                    result = self._exec_raw(query.query, args, mode)
+                    if result.error is not None:
+                        raise result.error
+                    results.append(result)
+        except sqlite3.Error as e:
+            return [_RESULT_TYPES[mode](error=e)]
+        return results
+
+    def exec_many_no_result(self, query_builder: QueryBuilder) -> DbHandlerNoResult:
+        """
+        Runs a builder holding a list of value maps as one statement executed once per row with `executemany`. The rows
+        are written in a single transaction, and none of them are kept if one fails.
+        :param query_builder: The query to run, built with a list of value maps sharing the same columns.
+        """
+        query = query_builder.build_many()
+        if query.error is not None:
+            logger.error('QUERY BUILD ERROR: %s', query.error)
+            return DbHandlerNoResult(error=query.error)
+        try:
+            with self.transaction():
+                result = self._exec_raw_many_no_result(query.query, query.args)
+                if result.error is not None:
+                    raise result.error
+        except sqlite3.Error as e:
+            return DbHandlerNoResult(error=e)
+        return result
 
     def exec_many_single_result(self, query_builder: QueryBuilder) -> List[DbHandlerSingleResult]:
-        pass
+        """
+        Runs a builder holding a list of value maps once per row on one prepared statement, returning a result per row.
+        `executemany` cannot return rows, so this is used for statements with a RETURNING clause. The rows are written
+        in a single transaction; if one fails, none are kept and only its error result is returned.
+        :param query_builder: The query to run, built with a list of value maps sharing the same columns.
+        """
+        return self._exec_many(query_builder, _FetchMode.ONE)
 
     def exec_many_all_results(self, query_builder: QueryBuilder) -> List[DbHandlerMultiResult]:
-        pass
+        """
+        Runs a builder holding a list of value maps once per row on one prepared statement, returning a result per row.
+        :param query_builder: The query to run, built with a list of value maps sharing the same columns.
+        """
+        return self._exec_many(query_builder, _FetchMode.ALL)
+
+    @contextmanager
+    def transaction(self, behavior: TransactionBehavior = TransactionBehavior.IMMEDIATE):
+        """
+        Runs the enclosed statements inside a single explicit transaction. Changes are committed when the block exits
+        and rolled back if an exception is raised, so a batch of writes costs one journal sync instead of one each.
+        Nested blocks run inside a savepoint of the enclosing transaction and only roll back their own changes.
+        :param behavior: The locking behavior used to begin the outermost transaction.
+        """
+        connection = self._pool.get()
+        if connection.transaction_depth > 0:
+            savepoint = f'squeeb_{connection.transaction_depth}'
+            begin_query = SavepointQueryBuilder(savepoint)
+            commit_query = ReleaseQueryBuilder(savepoint)
+            # Rolling back to a savepoint leaves it open, so it is released afterwards.
+            rollback_queries = (RollbackQueryBuilder(savepoint), ReleaseQueryBuilder(savepoint))
+        else:
+            begin_query = BeginTransactionQueryBuilder(behavior)
+            commit_query = CommitQueryBuilder()
+            rollback_queries = (RollbackQueryBuilder(),)
+        result = self.exec_query_no_result(begin_query)
+        if result.error is not None:
+            raise result.error
+        connection.transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            for query in rollback_queries:
+                self.exec_query_no_result(query)
+            raise
+        finally:
+            connection.transaction_depth -= 1
+        result = self.exec_query_no_result(commit_query)
+        if result.error is not None:
+            # A failed COMMIT, such as one refused by a deferred foreign key, leaves the transaction open. It is rolled
+            # back so that the connection is not stuck inside it.
+            for query in rollback_queries:
+                self.exec_query_no_result(query)
+            raise result.error
+
+    @contextmanager
+    def bulk_load_mode(self):
+        """
+        Drops every explicitly created index and disables foreign key enforcement while the enclosed block runs, then
+        recreates the indexes once it exits. Building an index once over the loaded rows is cheaper than updating it
+        row by row, but the caller must guarantee the new rows satisfy any unique indexes or rebuilding them fails.
+        Foreign key enforcement cannot be toggled inside a transaction, so enter this before `transaction()`. It is only
+        disabled on the calling thread's connection; other threads keep enforcing foreign keys, so the load should run
+        on the thread that entered this block.
+        While the block runs, model saves insert unsaved models with a plain INSERT even when `update_existing` is set,
+        since the unique index an upsert targets is dropped.
+        """
+        result = self._exec_raw_query_all_results(
+            "SELECT name, sql FROM sqlite_master WHERE type='index' AND sql IS NOT NULL")
+        if result.error is not None:
+            raise result.error
+        indexes = result.rows
+        foreign_keys = self.exec_query_single_result(PragmaQueryBuilder('foreign_keys')).row[0]
+        self.exec_query_single_result(PragmaQueryBuilder('foreign_keys', value='OFF'))
+        for i, index in enumerate(indexes):
+            result = self._exec_raw_query_no_result(f'DROP INDEX "{index["name"]}"')
+            if result.error is not None:
+                # The load must not run against a half-dropped set of indexes, so the ones dropped so far are restored.
+                for dropped in indexes[:i]:
+                    self._exec_raw_query_no_result(dropped['sql'])
+                self.exec_query_single_result(PragmaQueryBuilder('foreign_keys', value=foreign_keys))
+                raise result.error
+        error = None
+        self._bulk_loading = True
+        try:
+            yield self
+        finally:
+            self._bulk_loading = False
+            for index in indexes:
+                result = self._exec_raw_query_no_result(index['sql'])
+                error = error or result.error
+            self.exec_query_single_result(PragmaQueryBuilder('foreign_keys', value=foreign_keys))
+        if error is not None:
+            raise error
 
     def _table_exists(self, table_name) -> bool:
-        return self._exec_raw_query_single_result(
-            "SELECT * FROM sqlite_master WHERE type='table' AND name='%s'" % table_name)[0] == 1
+        result = self._exec_raw_query_single_result(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=? LIMIT 1", (table_name,))
+        return result.row is not None
 
     def _get_user_version(self) -> int:
         result = self._exec_raw_query_single_result("PRAGMA user_version")
         return result.row['user_version']
 
     def close(self) -> None:
-        if self._conn is not None:
-            self._conn.close()
-            self._conn = None
+        """
+        Closes the connection. Query planner statistics are refreshed and the WAL file is checkpointed and truncated
+        first, so the next session neither plans with stale statistics nor reads through a large WAL.
+        """
+        if self._finalizer.alive:
+            self.exec_query_single_result(PragmaQueryBuilder('optimize'))
+            self.exec_query_single_result(PragmaQueryBuilder('wal_checkpoint', target='TRUNCATE'))
+            self._finalizer()
+            self._pool = None
+
+
+def _get_all(self, model_class: Type[Model]) -> ModelList | None:
+    query = SelectQueryBuilder(model_class.__table_name__).build()
+    result = self._db._exec_raw_query_all_results(query.query)
+    return model_class.from_rows(result.rows) if result.error is None else None
 
 
 class DatabaseManager(Singleton):
@@ -154,18 +570,11 @@ class DatabaseManager(Singleton):
         except KeyError:
             raise TypeError('Class definition is missing the `database` argument.')
 
-        def make_get_all_method(model_class: Type[Model]):
-            def get_all(self):
-                query = SelectQueryBuilder(model_class.__table_name__).build()
-                result = self._db._exec_raw_query_all_results(query.query)
-                # TODO: Create array of objects deserialized from result.rows, return that instead.
-                return result.rows
-            return get_all
-
         cls = super().__new__(metacls, name, bases, namespace)
         setattr(cls, '_db', db())
         for table in db.__tables__:
-            setattr(cls, f'get_all_{camel_to_snake_case(table.__name__, lowercase=True)}s', make_get_all_method(table))
+            setattr(cls, f'get_all_{camel_to_snake_case(table.__name__, lowercase=True)}s',
+                    partialmethod(_get_all, model_class=table))
         return cls
 
 
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+import sys
 from abc import abstractmethod, ABC
 from dataclasses import dataclass, InitVar, field
 from enum import StrEnum
-from typing import Any, Tuple, Dict, Type, TYPE_CHECKING, ClassVar
+from typing import Any, Tuple, Type, TYPE_CHECKING, ClassVar
 
 from squeeb.common import Order
-from squeeb.util import _IStringable, ABCProtectedClassVarsMeta
+from squeeb.util import _IStringable, ABCProtectedClassVarsMeta, LRUCache
 
 if TYPE_CHECKING:
     from .models import Model
@@ -28,11 +29,31 @@ class ConflictClause(StrEnum):
     REPLACE = "REPLACE"
 
     def __str__(self):
-        return f'ON CONFLICT {super().__str__()}'
+        return self._rendered
+
+
+for _conflict_clause in ConflictClause:
+    _conflict_clause._rendered = f'ON CONFLICT {_conflict_clause.value}'
 
 
 class ColumnConstraint(_IStringable):
-    pass
+    """
+    Base class for column constraints. Constraints are immutable once created, so each one renders its SQL on the first
+    call to `__str__` and returns the stored string afterwards.
+    """
+
+    @abstractmethod
+    def _render(self) -> str:
+        """Returns the constraint's SQL text."""
+        pass
+
+    def __str__(self) -> str:
+        rendered = self.__dict__.get('_cached_str')
+        if rendered is None:
+            rendered = self._render()
+            # Set through object since the constraint dataclasses are frozen.
+            object.__setattr__(self, '_cached_str', rendered)
+        return rendered
 
 
 @dataclass(frozen=True)
@@ -42,17 +63,12 @@ class PrimaryKey(ColumnConstraint):
     autoincrement: bool = False
     unique: bool = False
 
-    def __str__(self) -> str:
-        output = ['PRIMARY KEY']
-        if self.order is not None:
-            output.append(self.order)
-        if self.conflict_clause is not None:
-            output.append(self.conflict_clause)
-        if self.autoincrement is True:
-            output.append('AUTOINCREMENT')
-        if self.unique is True:
-            output.append('UNIQUE')
-        return ' '.join(output)
+    def _render(self) -> str:
+        order = f' {self.order}' if self.order is not None else ''
+        conflict_clause = f' {self.conflict_clause}' if self.conflict_clause is not None else ''
+        autoincrement = ' AUTOINCREMENT' if self.autoincrement is True else ''
+        unique = ' UNIQUE' if self.unique is True else ''
+        return f'PRIMARY KEY{order}{conflict_clause}{autoincrement}{unique}'
 
 
 class KeyAction(StrEnum):
@@ -76,43 +92,35 @@ class ForeignKey(ColumnConstraint):
     def __post_init__(self, foreign_table_column: TableColumn):
         object.__setattr__(self, 'foreign_column_name', foreign_table_column.column_name)
 
-    def __str__(self) -> str:
-        output = [f'REFERENCES "{self.foreign_table_class.__table_name__}"("{self.foreign_column_name}")']
-        if self.on_delete_action is not None:
-            output.append(f'ON DELETE {self.on_delete_action}')
-        if self.on_update_action is not None:
-            output.append(f'ON UPDATE {self.on_update_action}')
-        return ' '.join(output)
+    def _render(self) -> str:
+        on_delete = f' ON DELETE {self.on_delete_action}' if self.on_delete_action is not None else ''
+        on_update = f' ON UPDATE {self.on_update_action}' if self.on_update_action is not None else ''
+        return (f'REFERENCES "{self.foreign_table_class.__table_name__}"("{self.foreign_column_name}")'
+                f'{on_delete}{on_update}')
 
 
 @dataclass(frozen=True)
 class ConflictClauseConstraint(ColumnConstraint, ABC):
     conflict_clause: ConflictClause = None
+    keyword: ClassVar[str]
 
-    @property
-    @abstractmethod
-    def keyword(self):
-        pass
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # The keyword is a plain class attribute, so it is checked here in place of an abstract property.
+        if not isinstance(getattr(cls, 'keyword', None), str):
+            raise TypeError(f'{cls.__name__} must define its constraint keyword.')
 
-    def __str__(self) -> str:
-        output = [self.keyword]
-        if self.conflict_clause is not None:
-            output.append(self.conflict_clause)
-        return ' '.join(output)
+    def _render(self) -> str:
+        conflict_clause = f' {self.conflict_clause}' if self.conflict_clause is not None else ''
+        return f'{self.keyword}{conflict_clause}'
 
 
 class NotNull(ConflictClauseConstraint):
-
-    @property
-    def keyword(self):
-        return 'NOT NULL'
+    keyword = 'NOT NULL'
 
 
 class Unique(ConflictClauseConstraint):
-
-    @property
-    def keyword(self):
-        return 'UNIQUE'
+    keyword = 'UNIQUE'
 
 
 class CollateSequence(StrEnum):
@@ -121,11 +129,11 @@ class CollateSequence(StrEnum):
     RTRIM = "RTRIM"
 
 
-@dataclass
+@dataclass(frozen=True)
 class Collate(ColumnConstraint):
     sequence: CollateSequence
 
-    def __str__(self):
+    def _render(self) -> str:
         return f'COLLATE {self.sequence}' if isinstance(self.sequence, CollateSequence) else ''
 
 
@@ -140,25 +148,37 @@ class Defaults(StrEnum):
 class DefaultValue(ColumnConstraint):
     value: Any = None
 
-    def __str__(self) -> str:
+    def _render(self) -> str:
         # TODO: Adapt this to provide self.value as an argument to be escaped by sqlite.execute()
         return f'DEFAULT {self.value}' if self.value is not None else ''
 
 
+@dataclass(frozen=True)
 class DefaultExpression(DefaultValue):
 
-    def __getattribute__(self, __name):
-        if __name == 'value':
-            return f'({super().__getattribute__(__name)})'
-        return super().__getattribute__(__name)
+    def __post_init__(self):
+        # Expressions must be parenthesized in a DEFAULT clause. The value is wrapped once here rather than on every read.
+        object.__setattr__(self, 'value', f'({self.value})')
 
 
-@dataclass
 class TableColumn(_IStringable, metaclass=ABCProtectedClassVarsMeta):
-    __column_name__: ClassVar[str] = field(init=False)
-    __data_type__: ClassVar[DataType] = field(init=False)
-    __constraint__: ClassVar[ColumnConstraint] = field(init=False)
-    value: Any
+    # A column is created for every field of every model instance, so it holds only its value and carries no __dict__.
+    # Generated subclasses declare empty slots for the same reason.
+    __slots__ = ('value',)
+    __column_name__: ClassVar[str]
+    __data_type__: ClassVar[DataType]
+    __constraint__: ClassVar[ColumnConstraint]
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __repr__(self) -> str:
+        return f'{type(self).__qualname__}(value={self.value!r})'
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.value == other.value
 
     @classmethod
     def with_name(cls, column_name: str):
@@ -168,13 +188,18 @@ class TableColumn(_IStringable, metaclass=ABCProtectedClassVarsMeta):
             return cls
         else:
             class TableColumnWithName(cls):
-                pass
+                __slots__ = ()
 
             TableColumnWithName.__column_name__ = column_name
             return TableColumnWithName
 
     def __hash__(self):
-        return hash((self.column_name, self.data_type, self.constraint, self.value))
+        # The definition is fixed per class, so its hash is stored on the class and only combined with the value here.
+        column_class = type(self)
+        definition_hash = column_class.__dict__.get('_definition_hash')
+        if definition_hash is None:
+            definition_hash = column_class._definition_hash = hash((self.column_name, self.data_type, self.constraint))
+        return hash((definition_hash, self.value))
 
     @property
     def column_name(self) -> str:
@@ -189,13 +214,33 @@ class TableColumn(_IStringable, metaclass=ABCProtectedClassVarsMeta):
         return self.__constraint__
 
     def __str__(self) -> str:
-        output = [self.column_name, self.data_type]
-        if self.constraint is not None:
-            output.append(str(self.constraint))
-        return ' '.join(output)
+        # Everything rendered here is a class variable, so the text is stored on the column class itself. It is only read
+        # from the class's own namespace, since a subclass made by `with_name` renders under a different name.
+        column_class = type(self)
+        rendered = column_class.__dict__.get('_cached_str')
+        if rendered is None:
+            constraint = f' {self.constraint}' if self.constraint is not None else ''
+            rendered = column_class._cached_str = f'{self.column_name} {self.data_type}{constraint}'
+        return rendered
+
+
+# Column classes by definition. Every distinct definition creates a class, so the registry is bounded to keep programs
+# that build columns on the fly from holding on to all of them. Classes already attached to a model stay alive there.
+__column_classes: LRUCache[Tuple[DataType, str, ColumnConstraint], Type[TableColumn]] = LRUCache(1024)
 
+# Constraints by value, so that equal constraints written out at different call sites become one shared object.
+_constraint_intern: LRUCache[ColumnConstraint, ColumnConstraint] = LRUCache(1024)
 
-__column_classes: Dict[Tuple[DataType, str, ColumnConstraint], Type[TableColumn]] = {}
+
+def _intern_constraint(constraint: ColumnConstraint) -> ColumnConstraint:
+    """
+    Returns a constraint equal to `constraint`, shared with any equal constraint passed in before. Constraints are
+    immutable, so sharing them is safe, and the shared object renders its SQL only once.
+    """
+    interned = _constraint_intern.get(constraint)
+    if interned is None:
+        interned = _constraint_intern[constraint] = constraint
+    return interned
 
 
 def column(data_type: DataType, value: Any = None, column_name: str = None,
@@ -209,32 +254,37 @@ def column(data_type: DataType, value: Any = None, column_name: str = None,
     :param constraint: Optional ColumnConstraint object to attach to this column.
     :return: An instance of the resulting TableColumnClass.
     """
-    if (data_type, column_name, constraint) in __column_classes:
-        column_class = __column_classes[(data_type, column_name, constraint)]
-    else:
+    if column_name is not None:
+        column_name = sys.intern(column_name)
+    if constraint is not None:
+        constraint = _intern_constraint(constraint)
+    key = (data_type, column_name, constraint)
+    column_class = __column_classes.get(key)
+    if column_class is None:
         if not isinstance(data_type, DataType):
             raise TypeError('Column data_type must be a DataType object.')
 
         class TableColumnClass(TableColumn):
-            pass
+            __slots__ = ()
 
         if column_name is not None:
             TableColumnClass.__column_name__ = column_name
         TableColumnClass.__data_type__ = data_type
         TableColumnClass.__constraint__ = constraint
-        __column_classes[(data_type, column_name, constraint)] = TableColumnClass
-        column_class = TableColumnClass
+        column_class = __column_classes[key] = TableColumnClass
     return column_class(value)
 
 
 def copy_column(column: TableColumn, new_name: str, use_existing: bool = True) -> TableColumn:
     column_class: Type[TableColumn] = column.__class__
-    if (column_class.__data_type__, new_name, column_class.__constraint__) in __column_classes:
+    new_name = sys.intern(new_name)
+    key = (column_class.__data_type__, new_name, column_class.__constraint__)
+    existing_class = __column_classes.get(key)
+    if existing_class is not None:
         if use_existing is True:
-            return __column_classes[(column_class.__data_type__, new_name, column_class.__constraint__)](column.value)
+            return existing_class(column.value)
         else:
             raise ValueError('This column definition already exists.')
     else:
-        copied_column_class = column_class.with_name(new_name)
-        __column_classes[(column_class.__data_type__, new_name, column_class.__constraint__)] = copied_column_class
+        copied_column_class = __column_classes[key] = column_class.with_name(new_name)
         return copied_column_class(column.value)
@@ -1,11 +1,56 @@
-from typing import Type
+import logging
+from operator import attrgetter
+from typing import Type, List
 
 from squeeb.db import Database
+from squeeb.model.columns import ForeignKey, DataType
+from squeeb.model.index import TableIndex, IndexedColumn
 from squeeb.model.models import Model
+from squeeb.query import InsertQueryBuilder, SelectQueryBuilder, DeleteQueryBuilder, where
 from squeeb.util import camel_to_snake_case
 
+logger = logging.getLogger(__name__)
 
-def table(cls: Type[Model] = None, db_class: Type[Database] = None, table_name: str = None):
+
+def _foreign_key_indexes(cls: Type[Model], table_name: str) -> List[TableIndex]:
+    """
+    Creates an index for every foreign key column that is not already the leading column of a declared index.
+    Without one, SQLite must scan the whole referencing table for joins and foreign key checks on that column.
+    :param cls: The model class being decorated.
+    :param table_name: The table name the model is being registered as.
+    :return: A list of the generated TableIndex objects.
+    """
+    indexed = {index.columns[0].column.column_name for index in cls.__indexes__ if len(index.columns) > 0}
+    indexes = []
+    for column in cls.columns():
+        if isinstance(column.constraint, ForeignKey) and column.column_name not in indexed:
+            index = TableIndex([IndexedColumn(column)], if_not_exists=True)
+            index._setup(cls, f'{table_name}_{column.column_name}_idx')
+            indexes.append(index)
+    return indexes
+
+
+def _upsert_sql(cls: Type[Model]) -> str | None:
+    """
+    Builds an INSERT that, on a conflict with the model's first unique index, updates the existing row with the new row's
+    non-null values and returns its id. Returns None when the model has no unique index.
+    :param cls: The model class being decorated.
+    """
+    index = next((index for index in cls.__indexes__ if index.is_unique), None)
+    if index is None:
+        return None
+    target = [column.column.column_name for column in index.columns]
+    updates = [f'{name} = COALESCE(excluded.{name}, {name})' for name in cls.column_names()
+               if name not in target and name != cls._id_col_name]
+    if len(updates) == 0:
+        # DO NOTHING would not return the conflicting row's id, so a no-op update is used instead.
+        updates = [f'{target[0]} = excluded.{target[0]}']
+    return f'{cls.__insert_sql__} ON CONFLICT ({", ".join(target)}) DO UPDATE SET {", ".join(updates)} ' \
+           f'RETURNING {cls._id_col_name}'
+
+
+def table(cls: Type[Model] = None, db_class: Type[Database] = None, table_name: str = None,
+          without_rowid: bool = None):
     """
     Decorates a Model subclass to wire up internal dependencies.
     :param cls: The class being generated. This is passed automatically and can be ignored.
@@ -13,6 +58,10 @@ def table(cls: Type[Model] = None, db_class: Type[Database] = None, table_name:
     :param table_name: The table name that this model will be represented as in the database.
            The name will default to an all lower-case snake-cased pluralized version of your models name.
            For example: A model class named 'ItemRecord' will become 'item_records'.
+           Foreign key columns that do not lead an existing index are given one named '<table_name>_<column>_idx'.
+    :param without_rowid: Whether the table is created WITHOUT ROWID, storing rows in the primary key's B-tree rather
+           than in a rowid B-tree with a separate primary key index. Defaults to True when the primary key is not an
+           INTEGER column, since an INTEGER PRIMARY KEY is already an alias for the rowid.
     :return: A wrapped subclass of your decorated class definition.
     """
     if cls is not None and not issubclass(cls, Model):
@@ -27,8 +76,25 @@ def table(cls: Type[Model] = None, db_class: Type[Database] = None, table_name:
 
         clss.__table_name__ = _table_name
         clss._db = db_class
+        clss.__indexes__ = _foreign_key_indexes(clss, _table_name)
+        if hasattr(clss, '__id_key__'):
+            primary_key = getattr(clss, clss.__id_key__)
+            _without_rowid = without_rowid if without_rowid is not None \
+                else primary_key.data_type is not DataType.INTEGER
+            if _without_rowid and primary_key.constraint.autoincrement:
+                raise TypeError("A WITHOUT ROWID table cannot have an AUTOINCREMENT primary key.")
+            clss.__without_rowid__ = _without_rowid
+
+        # The single-row statements and the getter for the INSERT arguments are fixed per table, so they are built once
+        # here rather than on every call. The id value in the WHERE clauses only becomes a bound argument.
+        clss.__insert_sql__ = InsertQueryBuilder(_table_name, dict.fromkeys(clss.column_names())).build().query
+        clss.__select_sql__ = SelectQueryBuilder(_table_name, None, where(clss._id_col_name).equals(0)).build().query
+        clss.__delete_sql__ = DeleteQueryBuilder(_table_name, None, where(clss._id_col_name).equals(0)).build().query
+        clss.__upsert_sql__ = _upsert_sql(clss)
+        getter = attrgetter(*(f'{name}.value' for name in clss.__mapping__))
+        clss.__insert_values__ = getter if len(clss.__mapping__) > 1 else lambda model: (getter(model),)
 
-        print(f'__TABLE CLASS__ . __TABLE NAME__ is {clss.__name__}.{clss.__table_name__}')
+        logger.debug('Model %s is registered as table "%s".', clss.__name__, clss.__table_name__)
         db_class.register_table(clss)
         return clss
 
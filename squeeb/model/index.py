@@ -23,12 +23,9 @@ class IndexedColumn(_IStringable):
         return hash((self.column, self.collation_name, self.sort_order))
 
     def __str__(self) -> str:
-        output = [self.column.column_name]
-        if self.collation_name is not None:
-            output.append(f'COLLATE {self.collation_name}')
-        if self.sort_order is not None:
-            output.append(str(self.sort_order))
-        return ' '.join(output)
+        collation = f' COLLATE {self.collation_name}' if self.collation_name is not None else ''
+        sort_order = f' {self.sort_order}' if self.sort_order is not None else ''
+        return f'{self.column.column_name}{collation}{sort_order}'
 
 
 @dataclass(frozen=True)
@@ -1,22 +1,27 @@
 from __future__ import annotations
 
 import functools
+import logging
 import sqlite3
 from abc import ABCMeta, abstractmethod
+from collections import deque
 from copy import deepcopy
 from dataclasses import dataclass, field
 from types import MappingProxyType as FrozenDict
-from typing import Type, Dict, List, ClassVar, TYPE_CHECKING
+from typing import Type, Dict, List, ClassVar, Tuple, Callable, Any, Iterator, Iterable, TYPE_CHECKING
 
-from squeeb.common import ValueMapping
-from squeeb.query import InsertQueryBuilder, UpdateQueryBuilder, DeleteQueryBuilder, SelectQueryBuilder, where
-from squeeb.query.queries import CreateTableQueryBuilder
+from squeeb.common import ValueMapping, SQLITE_MAX_VARIABLES
+from squeeb.query import InsertQueryBuilder, UpdateQueryBuilder, DeleteQueryBuilder, SelectQueryBuilder, where, \
+    QueryCondition
+from squeeb.query.queries import CreateTableQueryBuilder, CreateIndexQueryBuilder
 from squeeb.util import FrozenList
 from .columns import TableColumn, PrimaryKey, ForeignKey, ColumnConstraint, copy_column
 from .index import TableIndex
 
 if TYPE_CHECKING:
-    from squeeb.db import Database
+    from squeeb.db import Database, BaseDbHandlerResult
+
+logger = logging.getLogger(__name__)
 
 
 class DbOperationError(Exception):
@@ -29,7 +34,7 @@ class DbOperationResult:
 
     @property
     def success(self):
-        return self.error is not None
+        return self.error is None
 
 
 class _ICrud(object, metaclass=ABCMeta):
@@ -47,6 +52,10 @@ class _ICrud(object, metaclass=ABCMeta):
         pass
 
 
+# Column default values of these types are shared between instances instead of being deep copied for each one.
+_IMMUTABLE_VALUE_TYPES = (type(None), bool, int, float, str, bytes)
+
+
 class ModelNamespace(dict):
     """
     Model Namespace class to handle setting default column names at model class definition.
@@ -81,6 +90,11 @@ class ModelMetaClass(ABCMeta):
                 indexes.append(value)
         result_class.__mapping__ = mapping
         result_class.__indexes__ = indexes
+        result_class.__field_index__ = FrozenDict({name: i for i, name in enumerate(result_class.__mapping__)})
+        # Resolved once per class so that each new instance only has to call the column constructors.
+        result_class.__column_defaults__ = tuple(
+            (name, type(column), column.value, not isinstance(column.value, _IMMUTABLE_VALUE_TYPES))
+            for name, column in ((name, getattr(result_class, name)) for name in result_class.__mapping__))
         # TODO: Refactor in a way to accommodate tables relying on sqlite's built-in `rowid` value
         #  in lieu of a primary key
         if len(mapping) > 0 and not hasattr(result_class, '__id_key__'):
@@ -108,13 +122,22 @@ class ModelMetaClass(ABCMeta):
 
 
 class Model(_ICrud, metaclass=ModelMetaClass):
-    # _changed_fields: List[str]
-
     __mapping__: ClassVar[Dict[str, str]]
+    # Field name to bit position in `_dirty_mask`, assigned in column definition order.
+    __field_index__: ClassVar[Dict[str, int]]
+    # Field name, column class, default value and whether the default must be deep copied for each new instance.
+    __column_defaults__: ClassVar[Tuple[Tuple[str, Type[TableColumn], Any, bool], ...]]
     __mapping_inverse__: ClassVar[Dict[str, str]]
     __indexes__: ClassVar[List[TableIndex]]
     __table_name__: ClassVar[str]
     __id_key__: ClassVar[str]
+    __without_rowid__: ClassVar[bool] = False
+    __insert_sql__: ClassVar[str]
+    __select_sql__: ClassVar[str]
+    __delete_sql__: ClassVar[str]
+    # INSERT that updates the existing row on a conflict with the first unique index, if the model has one.
+    __upsert_sql__: ClassVar[str | None] = None
+    __insert_values__: ClassVar[Callable[[Model], Tuple[Any, ...]]]
     _db: ClassVar[Type[Database] | Database]
     _id_col_name: ClassVar[str]
     _initialized: ClassVar[bool]
@@ -124,33 +147,32 @@ class Model(_ICrud, metaclass=ModelMetaClass):
         return ModelList(cls)
 
     def __init__(self) -> None:
-        self._changed_fields = set()
+        self._dirty_mask = 0
 
     def __new__(cls, *more):
         """Copies new instances of the model's default column objects."""
         instance = super().__new__(cls)
-        try:
-            if type(cls._db) is type:
-                cls._db = cls._db()
-        except AttributeError as e:
-            raise AttributeError("Database handler for this model has not been registered.")
-        for name in instance.__mapping__:
-            instance.__dict__[name] = deepcopy(getattr(instance, name))
-        instance._id = instance.__dict__[instance.__id_key__]
+        cls._database()
+        fields = instance.__dict__
+        for name, column_type, default, copy_default in cls.__column_defaults__:
+            fields[name] = column_type(deepcopy(default) if copy_default else default)
         return instance
 
     def __setattr__(self, __name, __value):
         """Setting a new value on a TableColumn field will set the value directly to the column rather than reassign
         the column reference."""
-        if hasattr(self, __name) and isinstance(attr := getattr(self, __name), TableColumn):
-            attr.value = __value
-            self._changed_fields.add(attr)
+        bit = self.__field_index__.get(__name)
+        if bit is not None:
+            # Both the column copy and the mask live in the instance dict, so they are updated there directly.
+            fields = self.__dict__
+            fields[__name].value = __value
+            fields['_dirty_mask'] |= 1 << bit
         else:
             super().__setattr__(__name, __value)
 
     @property
     def id(self):
-        return self._id
+        return self.__dict__[self.__id_key__]
 
     @property
     def id_col_name(self):
@@ -164,84 +186,260 @@ class Model(_ICrud, metaclass=ModelMetaClass):
     def initialized(self):
         return self.__class__._initialized
 
+    @classmethod
+    @functools.cache
+    def columns(cls) -> Tuple[TableColumn, ...]:
+        """Returns the model's default column objects in definition order. Computed once per model class."""
+        return tuple(getattr(cls, name) for name in cls.__mapping__)
+
+    @classmethod
+    @functools.cache
+    def column_names(cls) -> Tuple[str, ...]:
+        """Returns the model's table column names in definition order. Computed once per model class."""
+        return tuple(cls.__mapping__.values())
+
+    @classmethod
+    @functools.cache
+    def field_names(cls) -> Tuple[str, ...]:
+        """Returns the model's column field names in definition order. Computed once per model class."""
+        return tuple(cls.__mapping__)
+
+    def _dirty_field_names(self) -> List[str]:
+        """Returns the names of the fields that were set since the model was created or last saved."""
+        names = self.field_names()
+        dirty = []
+        mask = self._dirty_mask
+        while mask:
+            dirty.append(names[(mask & -mask).bit_length() - 1])
+            mask &= mask - 1
+        return dirty
+
+    @classmethod
+    @functools.lru_cache(maxsize=256)
+    def _fields_for_columns(cls, column_names: Tuple[str, ...]) -> Tuple[str, ...]:
+        """Resolves a result's column names to field names, cached so each result shape is only resolved once."""
+        try:
+            return tuple(cls.__mapping_inverse__[column_name] for column_name in column_names)
+        except KeyError as e:
+            raise AttributeError(f"No column mapping exists for column {e.args[0]}.")
+
+    @classmethod
+    def from_row(cls, columns_and_values: ValueMapping | sqlite3.Row) -> Model:
+        """
+        Creates a model populated from a mapping or a sqlite3.Row keyed by column name.
+        :param columns_and_values: The column names and values to be set.
+        """
+        model = cls()
+        model.populate(columns_and_values)
+        return model
+
+    @classmethod
+    def from_rows(cls, rows: List[sqlite3.Row]) -> ModelList:
+        """
+        Creates a model for each result row, see `ModelList.from_rows`.
+        :param rows: Result rows sharing the same columns, all of which must be mapped by the model.
+        :return: A ModelList of the populated models.
+        """
+        return ModelList.from_rows(cls, rows)
+
+    @classmethod
+    def iter_query(cls, where_condition: QueryCondition = None, chunk: int = 1000) -> Iterator[Model]:
+        """
+        Yields the model's rows matching an optional condition as models, fetching and building them `chunk` rows at a
+        time rather than materializing the whole result set first.
+        :param where_condition: The condition rows must match.
+        :param chunk: The number of rows fetched per batch.
+        """
+        for rows in cls._database().iter_query(SelectQueryBuilder(cls.__table_name__, None, where_condition), chunk):
+            yield from cls.from_rows(rows)
+
+    @classmethod
+    @functools.lru_cache(maxsize=256)
+    def _update_sql(cls, dirty_mask: int) -> Tuple[str, Tuple[str, ...]]:
+        """
+        Returns the UPDATE statement for a set of changed fields and the field names in its argument order. Statements
+        are cached by the dirty mask, so models changed in the same way share one built statement.
+        :param dirty_mask: The `_dirty_mask` of the changed fields.
+        """
+        names = cls.field_names()
+        fields = tuple(name for i, name in enumerate(names) if dirty_mask >> i & 1)
+        # The id value only becomes a bound argument, so any placeholder value renders the same SQL.
+        q = UpdateQueryBuilder(cls.__table_name__, dict.fromkeys(cls.__mapping__[name] for name in fields),
+                               where(cls._id_col_name).equals(0))
+        return q.build().query, fields
+
+    def _update_args(self, fields: Tuple[str, ...]) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name).value for name in fields) + (self.id.value,)
+
+    @classmethod
+    def _database(cls) -> Database:
+        """Returns the model's Database instance, instantiating the registered Database class on first use."""
+        try:
+            if isinstance(cls._db, type):
+                cls._db = cls._db()
+        except AttributeError:
+            raise AttributeError("Database handler for this model has not been registered.")
+        return cls._db
+
+    @classmethod
+    def bulk_insert(cls, rows: List[ValueMapping], batch: int = 500) -> DbOperationResult:
+        """
+        Inserts many rows using multi-row `INSERT ... VALUES (...), (...)` statements, all inside one transaction.
+        Rows are grouped by their column set and each statement is capped by SQLite's bound-parameter limit.
+        :param rows: Column name to value mappings for each row to be inserted.
+        :param batch: The maximum number of rows to insert per statement.
+        :return: A DbOperationResult carrying the first error encountered, if any. No rows are inserted on error.
+        """
+        groups: Dict[Tuple[str, ...], List[ValueMapping]] = {}
+        for row in rows:
+            groups.setdefault(tuple(row.keys()), []).append(row)
+        db = cls._database()
+        try:
+            with db.transaction():
+                for columns, group in groups.items():
+                    cls._bulk_insert_group(db, columns, group, batch)
+        except (DbOperationError, sqlite3.Error) as e:
+            return DbOperationResult(error=e if isinstance(e, DbOperationError) else DbOperationError(e))
+        return DbOperationResult()
+
+    @classmethod
+    def _bulk_insert_group(cls, db: Database, columns: Tuple[str, ...], group: List[ValueMapping], batch: int):
+        size = max(1, min(batch, SQLITE_MAX_VARIABLES // max(1, len(columns))))
+        full = len(group) - len(group) % size
+        if full > 0:
+            # Every full chunk shares one statement, so it is prepared once and the chunks are streamed through it.
+            query = InsertQueryBuilder(cls.__table_name__, group[:size]).build()
+            if query.error is not None:
+                raise DbOperationError(query.error)
+            args = (tuple(value for row in group[i:i + size] for value in row.values())
+                    for i in range(0, full, size))
+            result = db._exec_raw_many_no_result(query.query, args)
+            if result.error is not None:
+                raise DbOperationError(result.error)
+        if full < len(group):
+            result = db.exec_query_no_result(InsertQueryBuilder(cls.__table_name__, group[full:]))
+            if result.error is not None:
+                raise DbOperationError(result.error)
+
     @classmethod
     def _create_table_query(cls) -> CreateTableQueryBuilder:
-        # TODO: Implement the rest of this query builder once the class is completed.
-        return CreateTableQueryBuilder(cls.__table_name__)
+        return CreateTableQueryBuilder(cls, if_not_exists=True)
+
+    @classmethod
+    def _create_index_queries(cls) -> List[CreateIndexQueryBuilder]:
+        return [CreateIndexQueryBuilder(index).if_not_exists() for index in cls.__indexes__]
 
     @classmethod
-    def init_table(cls):
-        # TODO: NEEDS TO BE TESTED WHEN CreateTableQueryBuilder IS IMPLEMENTED!
+    def init_table(cls, db: Database) -> bool:
+        """
+        Creates the model's table and indexes from its column and index definitions if they do not already exist.
+        :param db: The Database instance the table is created in.
+        :return: True if every statement succeeded.
+        """
         if not hasattr(cls, '_initialized') or cls._initialized is not True:
-            print(f'Table "{cls.__table_name__}" is being created!')
-            pass
+            logger.debug('Table "%s" is being created.', cls.__table_name__)
+            for query in [cls._create_table_query()] + cls._create_index_queries():
+                result = db.exec_query_no_result(query)
+                if result.error is not None:
+                    return False
             cls._initialized = True
-            pass
-            # q = self._create_table_query()
-            # result = self._db.exec_query_no_result(q)
-            # if isinstance(result, sqlite3.Error):
-            #     init_result = DbOperationResult(error=DbOperationError(result))
-            # elif isinstance(result, int):
-            #     self.__class__._initialized = True
-            #     init_result = DbOperationResult()
-            # else:
-            #     init_result = DbOperationResult(error=DbOperationError("Unknown error encountered."))
-            # if not init_result.success:
-            #     raise RuntimeError("The database table failed to be created.")
-
-            if len(cls.__indexes__) > 0:
-                for index in cls.__indexes__:
-                    # TODO: Create and execute CreateIndexQueryBuilders for each index
-                    pass
         else:
-            print(f'Table "{cls.__table_name__}" HAS ALREADY BEEN created!')
+            logger.debug('Table "%s" has already been created.', cls.__table_name__)
+        return True
 
     def delete(self) -> DbOperationResult:
-        # TODO: Review and confirm if this still works after AbstractModel class refactor.
-        if self.id is None:
+        if self.id.value is None:
             return DbOperationResult("Model is not saved and cannot be deleted. No action took place.")
-        else:
-            q = DeleteQueryBuilder(self._table_name)
-            q.where = where(self.id_col_name).equals(self.id.value)
-            result = self._db_handler.exec_query_no_result(q)
-            if isinstance(result, sqlite3.Error):
-                return DbOperationResult(error=DbOperationError(result))
-            elif isinstance(result, int):
-                return DbOperationResult("Rows changed: %d" % result)
-            else:
-                return DbOperationResult(error=DbOperationError("Unknown error encountered."))
+        result = self._database()._exec_raw_query_no_result(self.__delete_sql__, (self.id.value,))
+        if result.error is not None:
+            return DbOperationResult(error=DbOperationError(result.error))
+        self._reset_deleted()
+        if result.rowcount == 0:
+            return DbOperationResult(error=DbOperationError("Model no longer exists in the database."))
+        return DbOperationResult()
+
+    def _reset_deleted(self) -> None:
+        # The model no longer has a row, so a later save inserts every field again. A database assigned id is cleared,
+        # while a natural key set by hand is kept, since the model cannot be inserted without it.
+        if not self.__without_rowid__:
+            self.id.value = None
+        self._dirty_mask = (1 << len(self.__field_index__)) - 1
 
     def refresh(self) -> DbOperationResult:
-        pass
+        if self.id.value is None:
+            return DbOperationResult("Model is not saved and cannot be refreshed. No action took place.")
+        result = self._database()._exec_raw_query_single_result(self.__select_sql__, (self.id.value,))
+        if result.error is not None:
+            return DbOperationResult(error=DbOperationError(result.error))
+        if result.row is None:
+            return DbOperationResult(error=DbOperationError("Model no longer exists in the database."))
+        self.populate(result.row)
+        self._dirty_mask = 0
+        return DbOperationResult()
 
     def save(self, update_existing: bool = True) -> DbOperationResult:
-        # TODO: Review and confirm if this still works after AbstractModel class refactor.
+        """
+        Inserts the model if it has no id yet, otherwise writes its changed fields. A model whose id matches no row, such
+        as one keyed by a value set by hand, is inserted instead.
+        :param update_existing: Whether an unsaved model whose unique key matches an existing row updates that row with
+               its non-null values and takes its id, rather than failing the unique constraint. Not available inside
+               `Database.bulk_load_mode()`, where the unique index is dropped and the model is inserted as is.
+        """
+        db = self._database()
         if self.id.value is None:
-            q = InsertQueryBuilder(self.table_name).set_value(self._get_value_map())
-            action = 'Insert'
-            # TODO: Retrieve and update the self.id value after insertion.
+            result = self._insert(db, update_existing)
         else:
-            q = UpdateQueryBuilder(self.table_name).set_value(self._get_value_map(True))
-            q.where = where(self.id_col_name).equals(self.id.value)
-            action = 'Update'
-        result = self._db_handler.exec_query_single_result(q)
-        return DbOperationResult('%s operation %s' % (action, 'success' if result.success else 'failure'),
-                                 [result.row], DbOperationError(result.error) if result.error is not None else None)
-
-    def _get_value_map(self, only_updated_fields: bool = False) -> List[ValueMapping]:
-        value_map = []
-        for class_field_name, column_name in self.__mapping__.items():
-            attr = getattr(self, class_field_name)
-            if not only_updated_fields or attr not in self._changed_fields:
-                continue
-            value_map.append({column_name: attr.value})
-        return value_map
+            if self._dirty_mask == 0:
+                return DbOperationResult()
+            result = self._update_or_insert(db, update_existing)
+        if result.error is not None:
+            return DbOperationResult(error=DbOperationError(result.error))
+        self._dirty_mask = 0
+        return DbOperationResult()
+
+    def _update_or_insert(self, db: Database, upsert: bool) -> BaseDbHandlerResult:
+        sql, fields = self._update_sql(self._dirty_mask)
+        result = db._exec_raw_query_no_result(sql, self._update_args(fields))
+        if result.error is None and result.rowcount == 0:
+            # Having an id does not mean the row exists. Natural keys are set by hand before the first save.
+            result = self._insert(db, upsert)
+        return result
+
+    def _insert(self, db: Database, upsert: bool) -> BaseDbHandlerResult:
+        args = self.__class__.__insert_values__(self)
+        if upsert and self.__upsert_sql__ is not None and not db._bulk_loading:
+            result = db._exec_raw_query_single_result(self.__upsert_sql__, args)
+            if result.error is None:
+                self.id.value = result.row[0]
+        else:
+            result = db._exec_raw_query_no_result(self.__insert_sql__, args)
+            if result.error is None and not self.__without_rowid__:
+                self.id.value = result.lastrowid
+        return result
+
+    def _get_value_map(self, only_updated_fields: bool = False) -> ValueMapping:
+        names = self._dirty_field_names() if only_updated_fields else self.field_names()
+        return {self.__mapping__[name]: getattr(self, name).value for name in names}
 
     def populate(self, columns_and_values: ValueMapping | sqlite3.Row) -> None:
-        for column_name, value in columns_and_values.items():
-            if column_name not in self.__mapping_inverse__:
-                raise AttributeError(f"No column mapping exists for column {column_name}.")
-            getattr(self, self.__mapping_inverse__[column_name]).value = value
+        """
+        Sets column values from a mapping or a sqlite3.Row keyed by column name.
+        :param columns_and_values: The column names and values to be set.
+        """
+        if isinstance(columns_and_values, sqlite3.Row):
+            self._bulk_set(self._fields_for_columns(tuple(columns_and_values.keys())), columns_and_values)
+        else:
+            self._bulk_set(self._fields_for_columns(tuple(columns_and_values)), columns_and_values.values())
+
+    def _bulk_set(self, names: Tuple[str, ...], values: Iterable[Any]) -> None:
+        """
+        Sets already resolved fields to loaded values without going through `__setattr__`, so the fields are not marked
+        dirty. Callers must pass field names from `_fields_for_columns`.
+        """
+        # The per-instance column copies live in the instance dict, so they are read from it directly.
+        fields = self.__dict__
+        for name, value in zip(names, values):
+            fields[name].value = value
 
 
 @dataclass(frozen=True)
@@ -259,6 +457,30 @@ class ModelList(list, _ICrud):
             raise TypeError("Invalid model type provided.")
         self._model_type = model_type
 
+    @classmethod
+    def from_rows(cls, model_type: Type[Model], rows: List[sqlite3.Row]) -> ModelList:
+        """
+        Creates a list holding a model for each result row. The rows' column names are resolved to fields once for the
+        whole result set, and each row is then read positionally.
+        :param model_type: The model class the rows belong to.
+        :param rows: Result rows sharing the same columns, all of which must be mapped by the model.
+        """
+        models = cls(model_type)
+        if len(rows) == 0:
+            return models
+        names = model_type._fields_for_columns(tuple(rows[0].keys()))
+        loaded = []
+        for row in rows:
+            model = model_type()
+            model._bulk_set(names, row)
+            loaded.append(model)
+        models._unsafe_extend(loaded)
+        return models
+
+    def _unsafe_extend(self, models: Iterable[Model]) -> None:
+        """Extends the list without checking each model's type. Only for models this module created as `_model_type`."""
+        list.extend(self, models)
+
     def append(self, __object: Model) -> None:
         if not isinstance(__object, self._model_type):
             raise TypeError("Incorrect model type.")
@@ -284,68 +506,123 @@ class ModelList(list, _ICrud):
             return super().__iadd__(x)
 
     def _index_models(self):
-        self._index = {None: []}
-        for model in self:
-            if model.id is None:
-                self._index[None].append(model)
-            else:
-                self._index[model.id] = model
+        ids = [(model.id.value, model) for model in self]
+        self._index = {model_id: model for model_id, model in ids if model_id is not None}
+        self._index[None] = [model for model_id, model in ids if model_id is None]
+
+    def _id_chunks(self, ids: List) -> List[List]:
+        return [ids[i:i + SQLITE_MAX_VARIABLES] for i in range(0, len(ids), SQLITE_MAX_VARIABLES)]
 
     def delete(self) -> DbOperationResults:
-        if len(self) == 0:
-            return DbOperationResult("List is empty. No operation to perform.")
-        ids = []
-        cant_update = []
-        for model in self:
-            if model is not None:
-                if model.id is not None:
-                    ids.append(model.id)
-                else:
-                    cant_update.append(model)
-        if len(ids) > 0:
-            q = DeleteQueryBuilder(self[0].table_name)
-            q.where = where(self[0].id_col_name).is_in(ids)
-            result = self[0].db_handler.exec_query_no_result(q)
-            msg = '%d of %d rows deleted. %d skipped.' % (result.rowcount, len(ids), len(cant_update) > 0)
-            return DbOperationResult(msg, error=result.error, row_count=result.rowcount)
-        else:
-            return DbOperationResult('%d of %d rows skipped.' % (len(cant_update), len(self)))
+        """
+        Deletes every saved model in the list with one `DELETE ... WHERE id IN (...)` per chunk of ids, all inside a
+        single transaction. Models that were never saved are skipped. Once committed, the deleted models are reset the
+        same way `Model.delete` resets them, so that saving them again inserts them.
+        """
+        saved = [model for model in self if model.id.value is not None]
+        ids = [model.id.value for model in saved]
+        if len(ids) == 0:
+            return DbOperationResults()
+        db = self._model_type._database()
+        try:
+            with db.transaction():
+                for chunk in self._id_chunks(ids):
+                    q = DeleteQueryBuilder(self._model_type.__table_name__, None,
+                                           where(self._model_type._id_col_name).is_in(chunk))
+                    result = db.exec_query_no_result(q)
+                    if result.error is not None:
+                        raise DbOperationError(result.error)
+        except (DbOperationError, sqlite3.Error) as e:
+            return DbOperationResults(error=e if isinstance(e, DbOperationError) else DbOperationError(e))
+        for model in saved:
+            model._reset_deleted()
+        return DbOperationResults()
 
     def refresh(self) -> DbOperationResults:
-        if len(self) == 0:
-            return DbOperationResult("List is empty. No operation to perform.")
+        """
+        Reloads every saved model in the list from the database, selecting them by id in chunks. Each chunk's rows are
+        streamed in batches and written into the matching models as they arrive, rather than fetched into one list.
+        Models whose rows no longer exist are left as they are, and the result's error lists their ids.
+        """
         self._index_models()
-        ids = list(filter(lambda k: k is not None, self._index.keys()))
-        q = SelectQueryBuilder(self[0].table_name)
-        q.where = where(self[0].id_col_name).is_in(ids)
-        self[0].db_handler.exec_query_all_results(q)
+        ids = [key for key in self._index.keys() if key is not None]
+        model_type = self._model_type
+        db = model_type._database()
+        found = set()
+        try:
+            for chunk in self._id_chunks(ids):
+                q = SelectQueryBuilder(model_type.__table_name__, None, where(model_type._id_col_name).is_in(chunk))
+                for rows in db.iter_query(q):
+                    names = model_type._fields_for_columns(tuple(rows[0].keys()))
+                    for row in rows:
+                        model_id = row[model_type._id_col_name]
+                        found.add(model_id)
+                        model = self._index[model_id]
+                        model._bulk_set(names, row)
+                        model._dirty_mask = 0
+        except sqlite3.Error as e:
+            return DbOperationResults(error=DbOperationError(e))
+        missing = [model_id for model_id in ids if model_id not in found]
+        if len(missing) > 0:
+            return DbOperationResults(error=DbOperationError(
+                f"Models no longer exist in the database: {', '.join(map(str, missing))}"))
+        return DbOperationResults()
 
     def save(self, update_existing: bool = True) -> DbOperationResults:
-        if len(self) == 0:
-            return [DbOperationResult("List is empty. No operation to perform.")]
-        save = []
-        update = []
-        results = []
+        """
+        Saves every model in the list inside a single transaction. Unsaved models are inserted one row at a time through
+        the model's prepared INSERT statement, since each needs its own id back. Saved models with changes are grouped by
+        their changed columns and each group is written with one `executemany` call.
+        :param update_existing: Controls two things. Whether models that were already saved have their changes written,
+               and whether an unsaved model whose unique key matches an existing row updates that row with its non-null
+               values and takes its id (an upsert), rather than failing the unique constraint and the whole batch.
+               Upserts are skipped inside `Database.bulk_load_mode()`, as in `Model.save`.
+        """
+        inserts = []
+        updates = []
         for model in self:
-            if model.id is None:
-                save.append(model)
-            else:
-                update.append(model)
-        if len(save) > 0:
-            pass
-        if len(update) > 0:
-            pass
-        for model in save:
-            pass
-        for model in update:
-            pass
-        return results
-
-    def _save_many(self):
-        pass
-
-    def _update_many(self):
-        pass
+            if model.id.value is None:
+                inserts.append(model)
+            elif update_existing and model._dirty_mask != 0:
+                updates.append(model)
+        db = self._model_type._database()
+        try:
+            with db.transaction():
+                self._save_many(db, inserts, update_existing)
+                self._update_many(db, updates, update_existing)
+        except (DbOperationError, sqlite3.Error) as e:
+            # The inserted rows were rolled back, so the ids they were given no longer exist.
+            for model in inserts:
+                model.id.value = None
+            return DbOperationResults(error=e if isinstance(e, DbOperationError) else DbOperationError(e))
+        for model in inserts + updates:
+            model._dirty_mask = 0
+        return DbOperationResults()
+
+    def _save_many(self, db: Database, models: List[Model], upsert: bool):
+        # executemany cannot report the rowid of each inserted row, so rows are inserted one by one on the same prepared
+        # statement, which keeps the per-row cost to binding and stepping.
+        for model in models:
+            result = model._insert(db, upsert)
+            if result.error is not None:
+                raise DbOperationError(result.error)
+
+    def _update_many(self, db: Database, models: List[Model], upsert: bool):
+        groups: Dict[int, List[Model]] = {}
+        for model in models:
+            groups.setdefault(model._dirty_mask, []).append(model)
+        for dirty_mask, group in groups.items():
+            sql, fields = self._model_type._update_sql(dirty_mask)
+            result = db._exec_raw_many_no_result(sql, (model._update_args(fields) for model in group))
+            if result.error is not None:
+                raise DbOperationError(result.error)
+            if result.rowcount < len(group):
+                # Some ids matched no row. executemany only reports the total, so the group is written again one model
+                # at a time, inserting those that are missing. Rewriting the rows that were updated leaves them as is.
+                for model in group:
+                    result = model._update_or_insert(db, upsert)
+                    if result.error is not None:
+                        raise DbOperationError(result.error)
 
 
 def _validate_foreign_keys(database: Database):
@@ -355,8 +632,7 @@ def _validate_foreign_keys(database: Database):
     :param database: The given database to be validated.
     """
     for model in database.__class__.__tables__:
-        for column_name in model.__mapping__:
-            column: TableColumn = getattr(model, column_name)
+        for column in model.columns():
             constraint: ColumnConstraint = column.constraint
             if (isinstance(constraint, ForeignKey)
                     and constraint.foreign_table_class not in database.__class__.__tables__):
@@ -366,31 +642,31 @@ def _validate_foreign_keys(database: Database):
 
 def _sort_models(models: List[Type[Model]]):
     """
-    Sorts a list of Model classes in order of foreign key dependency.
+    Sorts a list of Model classes in order of foreign key dependency, using Kahn's algorithm.
     :param models: The list of model classes to be sorted.
     :return: A sorted list of model classes with foreign referenced tables coming before the tables that reference them.
     """
-    foreign_key_map: Dict[Type[Model], List[Type[Model]]] = {}
-
-    def foreign_models(model: Type[Model]) -> List[Type[Model]]:
-        if model not in foreign_key_map:
-            foreign_key_map[model] = []
-            for column_name in model.__mapping__:
-                column: TableColumn = getattr(model, column_name)
-                constraint: ColumnConstraint = column.constraint
-                if isinstance(constraint, ForeignKey):
-                    foreign_key_map[model].append(constraint.foreign_table_class)
-
-        return foreign_key_map[model]
-
-    def compare(a: Type[Model], b: Type[Model]):
-        map_a = foreign_models(a)
-        map_b = foreign_models(b)
-        if a in map_b:
-            return -1
-        elif b in map_a:
-            return 1
-        else:
-            return 0
-
-    return sorted(models, key=functools.cmp_to_key(compare))
+    position = {model: i for i, model in enumerate(models)}
+    in_degree = [0] * len(models)
+    dependents: List[List[int]] = [[] for _ in models]
+    for i, model in enumerate(models):
+        # Each referenced table counts once, and references to itself or to tables outside `models` impose no order.
+        for j in {position.get(column.constraint.foreign_table_class) for column in model.columns()
+                  if isinstance(column.constraint, ForeignKey)}:
+            if j is not None and j != i:
+                dependents[j].append(i)
+                in_degree[i] += 1
+    ready = deque(i for i, degree in enumerate(in_degree) if degree == 0)
+    order = []
+    while ready:
+        i = ready.popleft()
+        order.append(i)
+        for j in dependents[i]:
+            in_degree[j] -= 1
+            if in_degree[j] == 0:
+                ready.append(j)
+    if len(order) < len(models):
+        # Tables in a reference cycle have no valid order; they are appended as given.
+        placed = set(order)
+        order.extend(i for i in range(len(models)) if i not in placed)
+    return [models[i] for i in order]
@@ -1,3 +1,4 @@
+import sys
 from enum import StrEnum
 
 
@@ -12,3 +13,10 @@ class Operator(StrEnum):
     GLOB = 'GLOB'
     IN = 'IN'
     NOT_IN = 'NOT IN'
+
+
+# The SQL text of each member, kept as a plain interned str so rendering skips the enum's `value` descriptor, and
+# whether the member compares against a parenthesized list of values.
+for _operator in Operator:
+    _operator._sql = sys.intern(_operator.value)
+    _operator._is_multi = _operator is Operator.IN or _operator is Operator.NOT_IN
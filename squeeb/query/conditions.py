@@ -1,12 +1,14 @@
 from __future__ import annotations
 
+import sys
 from abc import ABCMeta, abstractmethod
+from itertools import chain
 from enum import StrEnum
-from typing import List, Iterable, Any, Self
+from typing import List, Iterable, Any, Self, Hashable
 
 from squeeb.query._queries import Operator
-from squeeb.query.values import _QueryValueHandlerMixin, QueryValues
-from squeeb.util import _IStringable
+from squeeb.query.values import _QueryValueHandlerMixin, QueryValues, _placeholders
+from squeeb.util import _IStringable, LRUCache
 
 
 class QueryConditionError(Exception):
@@ -18,11 +20,31 @@ class Junction(StrEnum):
     OR = " OR "
 
 
+for _junction in Junction:
+    _junction._sql = sys.intern(_junction.value)
+
+
 class _IQueryCondition(_IStringable, _QueryValueHandlerMixin):
-    pass
+    __slots__ = ()
+
+    @abstractmethod
+    def _write_to(self, parts: List[str]) -> None:
+        """Appends the condition's SQL fragments to `parts`. Nested conditions share one list, joined once at the top."""
+        pass
+
+    def __str__(self) -> str:
+        parts = []
+        self._write_to(parts)
+        return "".join(parts)
+
+    @abstractmethod
+    def _signature(self) -> Hashable:
+        """Returns a hashable description of everything that determines the condition's SQL text, but not its values."""
+        pass
 
 
 class _IQueryJuncture(object, metaclass=ABCMeta):
+    __slots__ = ()
 
     @property
     @abstractmethod
@@ -36,36 +58,52 @@ class _IQueryJuncture(object, metaclass=ABCMeta):
 
 
 class _BaseQueryCondition(_IQueryCondition):
-
-    _column_name: str = None
-    _value: Any | List[Any] = None
-    _operator: Operator = Operator.EQUALS
+    # Conditions are created by the handful for every query, so they carry no per-instance __dict__.
+    __slots__ = ('_column_name', '_value', '_operator', '_values', '_placeholder')
 
     def __init__(self, column_name_or_condition: str | _BaseQueryCondition = None,
                  value: Any = None,
                  operator: Operator = None) -> None:
-        if column_name_or_condition is not None and isinstance(column_name_or_condition, _BaseQueryCondition):
+        # Only the two concrete condition classes are ever copied, so an exact type check stands in for isinstance.
+        condition_type = type(column_name_or_condition)
+        if condition_type is MutableQueryCondition or condition_type is QueryCondition:
             self._column_name = column_name_or_condition._column_name
             self._value = column_name_or_condition._value
             self._operator = column_name_or_condition._operator
+            self._values = column_name_or_condition._values
+            self._placeholder = column_name_or_condition._placeholder
         else:
             self._column_name = column_name_or_condition
-            self._value = value
-            self._operator = operator
+            self._set_value(operator, value)
+
+    def _set_value(self, operator: Operator, value: Any) -> None:
+        """
+        Assigns the operator and value, normalizing the value's arguments and placeholder text once here rather than on
+        every build.
+        """
+        self._value = value
+        self._operator = operator
+        if isinstance(value, list):
+            self._values = tuple(value)
+            self._placeholder = _placeholders(len(value)) if operator is not None and operator._is_multi else "?"
+        else:
+            self._values = (value, )
+            self._placeholder = "?"
 
     def _get_values(self) -> QueryValues:
-        return tuple(self._value) if isinstance(self._value, list) else (self._value, )
+        return self._values
 
-    def __str__(self) -> str:
+    def _signature(self) -> Hashable:
+        return self._column_name, self._operator, self._placeholder, self._value is None
+
+    def _write_to(self, parts: List[str]) -> None:
         if self._column_name is None or self._value is None:
-            return ''
-        value = "(%s)" % ", ".join("?" * len(self._value)) \
-            if self._operator in (Operator.IN, Operator.NOT_IN) and isinstance(self._value, list) \
-            else "?"
-        return '%s %s %s' % (self._column_name, self._operator.value, value)
+            return
+        parts.append('%s %s %s' % (self._column_name, self._operator._sql, self._placeholder))
 
 
 class _MutableConditionMixin(object, metaclass=ABCMeta):
+    __slots__ = ()
 
     @abstractmethod
     def _set_condition(self, operator, value):
@@ -102,6 +140,7 @@ class _MutableConditionMixin(object, metaclass=ABCMeta):
 
 
 class QueryCondition(_BaseQueryCondition, _IQueryJuncture):
+    __slots__ = ()
 
     @property
     def and_(self) -> _BaseQueryConditionSequence:
@@ -113,56 +152,91 @@ class QueryCondition(_BaseQueryCondition, _IQueryJuncture):
 
 
 class MutableQueryCondition(_BaseQueryCondition, _MutableConditionMixin):
+    __slots__ = ()
+
+    def _assign(self, operator, value) -> None:
+        self._set_value(operator, list(value) if isinstance(value, (list, set, tuple)) else value)
 
     def _set_condition(self, operator, value) -> QueryCondition:
-        if isinstance(value, (list, set, tuple)):
-            self._value = []
-            self._value.extend(value)
-        else:
-            self._value = value
-        self._operator = operator
-        return QueryCondition(self)
+        self._assign(operator, value)
+        return _intern_condition(self)
+
+
+# Finished single-value conditions, keyed by column, operator and value. The value's type is part of the key so that
+# equal values of different types, such as 1 and 1.0, still bind as given. Every thread shares this cache. LRUCache
+# locks its own reads and writes, and two threads storing the same key at once only store equal conditions.
+_condition_intern: LRUCache[tuple, QueryCondition] = LRUCache(4096)
+
+
+def _intern_condition(condition: MutableQueryCondition) -> QueryCondition:
+    """
+    Returns a QueryCondition equal to `condition`, shared with any identical condition built before. QueryConditions are
+    never modified once created, so they are safe to share. List values are usually one-off sets of ids, so those
+    conditions are always copied instead.
+    """
+    value = condition._value
+    if isinstance(value, list):
+        return QueryCondition(condition)
+    key = (condition._column_name, condition._operator, type(value), value)
+    try:
+        interned = _condition_intern.get(key)
+    except TypeError:
+        return QueryCondition(condition)
+    if interned is None:
+        interned = _condition_intern[key] = QueryCondition(condition)
+    return interned
 
 
 class _BaseQueryConditionSequence(_IQueryCondition):
-
-    _conditions: List[_IQueryCondition | Junction] = []
+    __slots__ = ('_conditions',)
 
     def __init__(self, first_condition_or_sequence: _IQueryCondition | _BaseQueryConditionSequence,
                  first_junction: Junction = None) -> None:
         if isinstance(first_condition_or_sequence, _BaseQueryConditionSequence):
+            # Sequences built from another one are views over the same chain, so the list is shared on purpose.
             self._conditions = first_condition_or_sequence._conditions
         elif isinstance(first_condition_or_sequence, _IQueryCondition):
-            self._conditions.append(first_condition_or_sequence)
+            self._conditions = [first_condition_or_sequence]
             if isinstance(first_junction, Junction):
                 self._conditions.append(first_junction)
         else:
-            pass
+            self._conditions = []
 
     def is_ready_for_condition(self) -> bool:
-        return isinstance(self._conditions[-1], Junction)
+        return type(self._conditions[-1]) is Junction
 
     def where(self, col_name_or_condition: str | _BaseQueryCondition) -> _MutableConditionMixin:
-        if isinstance(col_name_or_condition, _BaseQueryCondition):
-            self._conditions.append(col_name_or_condition)
-        elif isinstance(col_name_or_condition, str):
+        if type(col_name_or_condition) is str:
             self._conditions.append(MutableQueryCondition(col_name_or_condition))
+        elif isinstance(col_name_or_condition, _BaseQueryCondition):
+            self._conditions.append(col_name_or_condition)
         else:
             pass
         return MutableQueryConditionSequence(self)
 
     def _get_values(self) -> QueryValues:
-        values = []
+        # Junctions are the only non-condition entries, and an identity check on their exact type is cheaper than
+        # walking the MRO with isinstance. Nested conditions are asked through `_get_values` directly, skipping the
+        # `value_args` property lookup on every one of them.
+        return tuple(chain.from_iterable(condition._get_values() for condition in self._conditions
+                                         if type(condition) is not Junction))
+
+    def _signature(self) -> Hashable:
+        return tuple(condition if type(condition) is Junction else condition._signature()
+                     for condition in self._conditions)
+
+    def _write_to(self, parts: List[str]) -> None:
+        if self.is_ready_for_condition():
+            return
         for condition in self._conditions:
-            if isinstance(condition, _IQueryCondition):
-                values.extend(condition.value_args)
-        return tuple(values)
-
-    def __str__(self) -> str:
-        return "".join(map(str, self._conditions)) if not self.is_ready_for_condition() else ""
+            if type(condition) is Junction:
+                parts.append(condition._sql)
+            else:
+                condition._write_to(parts)
 
 
 class QueryConditionSequence(_BaseQueryConditionSequence, _IQueryJuncture):
+    __slots__ = ()
 
     @property
     def and_(self) -> Self:
@@ -182,33 +256,39 @@ class QueryConditionSequence(_BaseQueryConditionSequence, _IQueryJuncture):
 
 
 class MutableQueryConditionSequence(_BaseQueryConditionSequence, _MutableConditionMixin):
+    __slots__ = ()
 
     def _set_condition(self, operator, value):
-        if isinstance(self._conditions[-1], _MutableConditionMixin):
-            self._conditions[-1]._set_condition(operator, value)
+        # The sequence keeps the mutable condition itself, so it is assigned in place without building the standalone
+        # QueryCondition copy that `_set_condition` would return.
+        if isinstance(self._conditions[-1], MutableQueryCondition):
+            self._conditions[-1]._assign(operator, value)
         else:
             pass
         return QueryConditionSequence(self)
 
 
 class QueryConditionGroup(list, _IQueryCondition, _IQueryJuncture):
-
-    _conditions: List[_IQueryCondition] = []
-    _group_junction: Junction = None
+    __slots__ = ('_conditions', '_group_junction')
 
     def __init__(self, group_junction: Junction, conditions: Iterable[_IQueryCondition]) -> None:
         super().__init__()
         self._group_junction = group_junction
-        self._conditions.extend(conditions)
+        self._conditions = list(conditions)
 
     def _get_values(self) -> QueryValues:
-        values = []
-        for condition in self._conditions:
-            values.extend(condition.value_args)
-        return values
-
-    def __str__(self) -> str:
-        return '(%s)' % (self._group_junction.value.join(map(str, self._conditions)))
+        return list(chain.from_iterable(condition._get_values() for condition in self._conditions))
+
+    def _signature(self) -> Hashable:
+        return self._group_junction, tuple(condition._signature() for condition in self._conditions)
+
+    def _write_to(self, parts: List[str]) -> None:
+        parts.append('(')
+        for i, condition in enumerate(self._conditions):
+            if i > 0:
+                parts.append(self._group_junction._sql)
+            condition._write_to(parts)
+        parts.append(')')
 
     def __join(self, junction: Junction):
         if self._group_junction is junction:
@@ -1,28 +1,31 @@
 from __future__ import annotations
 
-import string
+import copy
 from abc import ABCMeta, abstractmethod
-from dataclasses import dataclass
 from enum import Enum, StrEnum
-from typing import Tuple, Any, List, TypeVar, Self, Type, TYPE_CHECKING
+from typing import Tuple, Any, List, TypeVar, Self, Type, NamedTuple, Hashable, TYPE_CHECKING
 
 from squeeb.common import ValueMapping
 from squeeb.query.conditions import _IQueryCondition, QueryConditionSequence, QueryConditionGroup, \
     MutableQueryCondition, QueryCondition
 from squeeb.query.values import _QueryValueMap, _QueryValueMapGroup
+from squeeb.util import LRUCache
 
 if TYPE_CHECKING:
     from squeeb.model.index import TableIndex
-    from squeeb.model.models import Model, TableColumn
+    from squeeb.model.models import Model
 
 
-@dataclass
-class Query:
+class Query(NamedTuple):
     query: str = None
     args: Tuple[Any, ...] = None
     error: str | Exception = None
 
 
+# Rendered SQL of cacheable builders, keyed by `AbstractQueryBuilder._cache_key()`. Builders are usually built once and
+# discarded, so the cache is shared by all of them rather than kept per instance.
+_query_str_cache: LRUCache[Hashable, str] = LRUCache(512)
+
 
 class _QueryArgs(Enum):
     VALUE = 1
@@ -30,15 +33,14 @@ class _QueryArgs(Enum):
 
 
 class AbstractQueryBuilder(object, metaclass=ABCMeta):
-    _table_name: str = None
-    _value_map: _QueryValueMap | _QueryValueMapGroup = None
-    _where_conditions: _IQueryCondition = None
+    __slots__ = ('_table_name', '_value_map', '_where_conditions')
 
     def __init__(self,
                  table_name: str,
                  value_map: ValueMapping | List[ValueMapping] = None,
                  where_condition: QueryCondition | QueryConditionSequence | QueryConditionGroup = None) -> None:
         self._table_name = table_name
+        self._value_map = None
         if value_map is not None:
             self.set_value(value_map)
         self._where_conditions = where_condition
@@ -82,22 +84,64 @@ class AbstractQueryBuilder(object, metaclass=ABCMeta):
         return self._where_conditions.value_args if self._where_conditions is not None else []
 
     def _get_args(self, q_args: List[_QueryArgs]) -> Tuple[Any]:
-        f_map = {
-            _QueryArgs.VALUE: self._value_map,
-            _QueryArgs.WHERE: self._where_conditions
-        }
         query_args = []
         for arg in q_args:
-            if isinstance(arg, _QueryArgs):
-                args_part = list(f_map[arg].value_args) if arg in f_map and f_map[arg] is not None else None
-                if args_part is None or len(args_part) == 0:
-                    continue  # Skip
+            if arg is _QueryArgs.VALUE and self._value_map is not None:
+                args_part = self._value_map._get_values()
+            elif arg is _QueryArgs.WHERE and self._where_conditions is not None:
+                args_part = self._where_conditions._get_values()
+            else:
+                continue  # Skip
+            if args_part:
                 query_args.extend(args_part)
         return tuple(query_args)
 
+    def _cache_key(self) -> Hashable | None:
+        """
+        Returns a key identifying the SQL text this builder renders, or None if the text is not cached. Only builders
+        whose text is fully determined by `_structure_key()` should return one.
+        """
+        return None
+
+    def _structure_key(self) -> Hashable:
+        return (type(self), self._table_name,
+                self._value_map._signature() if self._value_map is not None else None,
+                self._where_conditions._signature() if self._where_conditions is not None else None)
+
     def build(self) -> Query:
-        return Query(self._get_query_str(), self._get_args(self._get_args_needed())) if self._table_name is not None \
-            else Query(error="No table name provided.")
+        if self._table_name is None:
+            return Query(error="No table name provided.")
+        key = self._cache_key()
+        if key is None:
+            query_str = self._get_query_str()
+        else:
+            query_str = _query_str_cache.get(key)
+            if query_str is None:
+                query_str = _query_str_cache[key] = self._get_query_str()
+        return Query(query_str, self._get_args(self._get_args_needed()))
+
+    def build_many(self) -> Query:
+        """
+        Builds the statement for a single row of this builder's list of value maps, with `args` holding one argument
+        tuple per row, for use with `executemany`. Every value map must have the same columns.
+        """
+        if not isinstance(self._value_map, _QueryValueMapGroup) or len(self._value_map._value_maps) == 0:
+            return Query(error="build_many() requires a non-empty list of value maps.")
+        value_maps = self._value_map._value_maps
+        columns = value_maps[0]._signature()
+        if any(value_map._signature() != columns for value_map in value_maps):
+            return Query(error="All value maps must have the same columns.")
+        row = copy.copy(self)
+        row._value_map = value_maps[0]
+        query = row.build()
+        if query.error is not None:
+            return query
+        args_needed = self._get_args_needed()
+        args = []
+        for value_map in value_maps:
+            row._value_map = value_map
+            args.append(row._get_args(args_needed))
+        return Query(query.query, args)
 
 
 QueryBuilder = TypeVar("QueryBuilder", bound=AbstractQueryBuilder)
@@ -119,7 +163,7 @@ class BeginTransactionQueryBuilder(AbstractQueryBuilder):
         return ()
 
     def _get_query_str(self) -> str:
-        return f'BEGIN {self._behavior.value if self._behavior is not None else ''} TRANSACTION'
+        return f'BEGIN {self._behavior or ''} TRANSACTION'
 
 
 class CommitQueryBuilder(AbstractQueryBuilder):
@@ -144,10 +188,7 @@ class RollbackQueryBuilder(AbstractQueryBuilder):
         return ()
 
     def _get_query_str(self) -> str:
-        query = 'ROLLBACK'
-        if self._savepoint_name is not None:
-            query += f' TO {self._savepoint_name}'
-        return query
+        return f'ROLLBACK TO {self._savepoint_name}' if self._savepoint_name is not None else 'ROLLBACK'
 
 
 class SavepointQueryBuilder(AbstractQueryBuilder):
@@ -202,14 +243,10 @@ class CreateIndexQueryBuilder(AbstractQueryBuilder):
         return ()
 
     def _get_query_str(self) -> str:
-        tmpl = string.Template('CREATE $unique INDEX $if_not_exists "$name" ON "$table" ($columns)')
-        return tmpl.substitute({
-            "unique": 'UNIQUE' if self._unique is True else '',
-            "if_not_exists": 'IF NOT EXISTS' if self._if_not_exists is True else '',
-            "name": self._index.index_name,
-            "table": self._table_name,
-            "columns": self._get_columns_str()
-        })
+        unique = 'UNIQUE' if self._unique is True else ''
+        if_not_exists = 'IF NOT EXISTS' if self._if_not_exists is True else ''
+        return (f'CREATE {unique} INDEX {if_not_exists} "{self._index.index_name}" ON "{self._table_name}" '
+                f'({self._get_columns_str()})')
 
 
 class CreateTableQueryBuilder(AbstractQueryBuilder):
@@ -221,13 +258,13 @@ class CreateTableQueryBuilder(AbstractQueryBuilder):
 
     def __init__(self, table_model: Type[Model], is_temporary: bool = False, if_not_exists: bool = False,
                  strict: bool = False, without_rowid: bool = False) -> None:
-        super().__init__('')
+        super().__init__(table_model.__table_name__)
         self._table_model = table_model
-        # TODO: Move `is_temporary`, `strict`, `without_rowid` into Model class.
+        # TODO: Move `is_temporary`, `strict` into Model class.
         self._is_temporary = is_temporary
         self._if_not_exists = if_not_exists
         self._strict = strict
-        self._without_rowid = without_rowid
+        self._without_rowid = without_rowid or table_model.__without_rowid__
 
     def if_not_exists(self) -> Self:
         self._if_not_exists = True
@@ -246,29 +283,21 @@ class CreateTableQueryBuilder(AbstractQueryBuilder):
         return self
 
     def _get_columns_str(self) -> str:
-        columns = []
-        for column_name in self._table_model.__mapping__:
-            column: TableColumn = getattr(self._table_model, column_name)
-            columns.append(str(column))
-        return ', '.join(columns)
+        return ', '.join(str(column) for column in self._table_model.columns())
 
     def _get_args_needed(self) -> Tuple[_QueryArgs] | tuple:
         return ()
 
     def _get_query_str(self) -> str:
-        tmpl = string.Template('CREATE $temp TABLE $if_not_exists $table ($columns) $options')
         table_options = []
         if self._strict is True:
             table_options.append('STRICT')
         if self._without_rowid is True:
             table_options.append('WITHOUT ROWID')
-        return tmpl.substitute({
-            "temp": 'TEMPORARY' if self._is_temporary is True else '',
-            "if_not_exists": 'IF NOT EXISTS' if self._if_not_exists is True else '',
-            "table": self._table_name,
-            "columns": self._get_columns_str(),
-            "options": ', '.join(table_options)
-        })
+        temp = 'TEMPORARY' if self._is_temporary is True else ''
+        if_not_exists = 'IF NOT EXISTS' if self._if_not_exists is True else ''
+        return (f'CREATE {temp} TABLE {if_not_exists} "{self._table_name}" ({self._get_columns_str()}) '
+                f'{", ".join(table_options)}')
 
 
 class DropTableQueryBuilder(AbstractQueryBuilder):
@@ -282,57 +311,64 @@ class DropTableQueryBuilder(AbstractQueryBuilder):
 
 class InsertQueryBuilder(AbstractQueryBuilder):
 
+    def _cache_key(self) -> Hashable:
+        return self._structure_key()
+
     def _get_args_needed(self) -> List[_QueryArgs]:
         return [_QueryArgs.VALUE]
 
     def _get_query_str(self) -> str:
-        tmpl = string.Template('INSERT INTO $table $columns VALUES $values')
-        return tmpl.substitute({
-            "table": self._table_name,
-            "columns": self._get_columns_str(),
-            "values": self._get_values_str()
-        })
+        return f'INSERT INTO {self._table_name} {self._get_columns_str()} VALUES {self._get_values_str()}'
 
 
 class SelectQueryBuilder(AbstractQueryBuilder):
 
+    def _cache_key(self) -> Hashable:
+        return self._structure_key()
+
     def _get_args_needed(self) -> List[_QueryArgs]:
         return [_QueryArgs.WHERE]
 
+    def _get_columns_str(self) -> str:
+        # A parenthesized list would be read as a single row value, so selected columns are listed bare.
+        return ", ".join(self._value_map) if self._value_map is not None else "*"
+
     def _get_query_str(self) -> str:
-        tmpl = string.Template('SELECT $columns FROM $table $where')
-        return tmpl.substitute({
-            "columns": self._get_columns_str(),
-            "table": self._table_name,
-            "where": self._get_where_str()
-        }).strip()
+        where = self._get_where_str()
+        return f'SELECT {self._get_columns_str()} FROM {self._table_name} {where}' if where \
+            else f'SELECT {self._get_columns_str()} FROM {self._table_name}'
 
 
 class UpdateQueryBuilder(AbstractQueryBuilder):
 
+    def _cache_key(self) -> Hashable:
+        return self._structure_key()
+
+    def build(self) -> Query:
+        # A SET list is rendered from exactly one value map; without one the statement would be `UPDATE t SET`.
+        if not isinstance(self._value_map, _QueryValueMap) or len(self._value_map) == 0:
+            return Query(error="UPDATE requires a single, non-empty value map.")
+        return super().build()
+
     def _get_args_needed(self) -> List[_QueryArgs]:
         return [_QueryArgs.VALUE, _QueryArgs.WHERE]
 
     def _get_query_str(self) -> str:
-        tmpl = string.Template('UPDATE $table SET $changes $where')
-        return tmpl.substitute({
-            "table": self._table_name,
-            "changes": self._get_value_set_str(),
-            "where": self._get_where_str()
-        }).strip()
+        where = self._get_where_str()
+        return f'UPDATE {self._table_name} SET {self._get_value_set_str()} {where}' if where \
+            else f'UPDATE {self._table_name} SET {self._get_value_set_str()}'
 
 
 class DeleteQueryBuilder(AbstractQueryBuilder):
 
+    def _cache_key(self) -> Hashable:
+        return self._structure_key()
+
     def _get_args_needed(self) -> List[_QueryArgs]:
         return [_QueryArgs.WHERE]
 
     def _get_query_str(self) -> str:
-        tmpl = string.Template('DELETE FROM $table $where')
-        return tmpl.substitute({
-            "table": self._table_name,
-            "where": self._get_where_str()
-        }) if self._where_conditions is not None else ''
+        return f'DELETE FROM {self._table_name} {self._get_where_str()}' if self._where_conditions is not None else ''
 
 
 class PragmaQueryBuilder(AbstractQueryBuilder):
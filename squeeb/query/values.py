@@ -1,15 +1,25 @@
 from __future__ import annotations
 
 from abc import ABCMeta, abstractmethod
-from typing import TypeVar, Tuple, Any, Iterable, List, Generator
+from itertools import chain
+from typing import TypeVar, Tuple, Any, Iterable, List, Generator, Hashable
 
 from squeeb.common import ValueMapping
 
 
 QueryValues = TypeVar('QueryValues', Tuple[Any, ...], Generator[Tuple[Any, ...], None, None])
 
+# Parenthesized placeholder lists, indexed by their number of placeholders, prebuilt for the common widths.
+_PLACEHOLDERS = tuple("(%s)" % ", ".join("?" * n) for n in range(65))
+
+
+def _placeholders(n: int) -> str:
+    # Wider lists repeat the "?, " unit directly rather than joining a string of n question marks.
+    return _PLACEHOLDERS[n] if n < len(_PLACEHOLDERS) else "(" + "?, " * (n - 1) + "?)"
+
 
 class _QueryValueHandlerMixin(object, metaclass=ABCMeta):
+    __slots__ = ()
 
     @abstractmethod
     def _get_values(self) -> QueryValues:
@@ -34,30 +44,83 @@ class _IQueryValueStrings(object, metaclass=ABCMeta):
 
 
 class _QueryValueMap(dict, _QueryValueHandlerMixin, _IQueryValueStrings):
+    """
+    A column to value mapping. Strings derived from its keys are cached until the next mutation, since a map is usually
+    filled once and then rendered on every build.
+    """
 
     def __init__(self, values: ValueMapping) -> None:
         super().__init__()
         self.update(values)
 
+    def _invalidate(self) -> None:
+        self._keys = None
+        self._column_str = None
+        self._value_set_str = None
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        super().__setitem__(key, value)
+        self._invalidate()
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self._invalidate()
+
+    def __ior__(self, other: ValueMapping) -> _QueryValueMap:
+        self.update(other)
+        return self
+
+    def update(self, *args, **kwargs) -> None:
+        super().update(*args, **kwargs)
+        self._invalidate()
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        value = super().setdefault(key, default)
+        self._invalidate()
+        return value
+
+    def pop(self, *args) -> Any:
+        value = super().pop(*args)
+        self._invalidate()
+        return value
+
+    def popitem(self) -> Tuple[str, Any]:
+        item = super().popitem()
+        self._invalidate()
+        return item
+
+    def clear(self) -> None:
+        super().clear()
+        self._invalidate()
+
     def _get_values(self) -> Tuple[Any, ...]:
         return tuple(self.values())
 
+    def _signature(self) -> Hashable:
+        if self._keys is None:
+            self._keys = tuple(self)
+        return self._keys
+
     @property
     def column_str(self) -> str:
-        return "(%s)" % ", ".join(self.keys())
+        if self._column_str is None:
+            self._column_str = "(%s)" % ", ".join(self)
+        return self._column_str
 
     @property
     def values_str(self) -> str:
-        return "(%s)" % ", ".join("?" * len(self))
+        return _placeholders(len(self))
 
     @property
     def value_set_str(self) -> str:
-        return ", ".join(map(lambda key: "%s = ?" % key, self.keys()))
+        if self._value_set_str is None:
+            self._value_set_str = ", ".join([f"{key} = ?" for key in self])
+        return self._value_set_str
 
 
 class _QueryValueMapGroup(_QueryValueHandlerMixin, _IQueryValueStrings):
 
-    _value_maps: List[_QueryValueMap] = []
+    _value_maps: List[_QueryValueMap] = None
 
     @staticmethod
     def create(value_maps: Iterable[ValueMapping]) -> _QueryValueMapGroup:
@@ -67,18 +130,23 @@ class _QueryValueMapGroup(_QueryValueHandlerMixin, _IQueryValueStrings):
         return _QueryValueMapGroup(query_value_maps)
 
     def __init__(self, query_value_maps: Iterable[_QueryValueMap] = None) -> None:
+        self._value_maps = []
         for value_map in query_value_maps:
             # Type check happens in .add()
             self.add(value_map)
 
     def add(self, value_map: _QueryValueMap) -> None:
-        if not isinstance(value_map, _QueryValueMap):
+        if type(value_map) is not _QueryValueMap:
             raise TypeError("Object must be a _QueryValueMap")
         self._value_maps.append(value_map)
 
-    def _get_values(self) -> Generator[Tuple[Any, ...]]:
-        for value_map in self._value_maps:
-            yield value_map.value_args
+    def _get_values(self) -> Tuple[Any, ...]:
+        # Flattened in row order to line up with the multi-row `VALUES (?, ...), (?, ...)` placeholders.
+        return tuple(chain.from_iterable(value_map._get_values() for value_map in self._value_maps))
+
+    def _signature(self) -> Hashable:
+        # The columns come from the first value map; each map contributes a placeholder row of its own length.
+        return self.column_str, tuple(len(value_map) for value_map in self._value_maps)
 
     @property
     def column_str(self) -> str:
@@ -1,8 +1,13 @@
+import functools
 import re
+import threading
+from collections import OrderedDict
 from abc import ABCMeta, abstractmethod
-from typing import get_type_hints, List, ClassVar, get_origin, overload, Iterable, TypeVar, SupportsIndex
+from typing import get_type_hints, FrozenSet, ClassVar, get_origin, overload, Iterable, TypeVar, SupportsIndex, Callable, \
+    Hashable, Generic
 
 
+@functools.lru_cache(maxsize=None)
 def camel_to_snake_case(value: str, lowercase: bool = False, uppercase: bool = False):
     underscored = re.sub(r'([a-z])([A-Z])', r'\1_\2',
                          re.sub(r'([A-Z])([A-Z][a-z])', r'\1_\2', value))
@@ -15,6 +20,7 @@ def camel_to_snake_case(value: str, lowercase: bool = False, uppercase: bool = F
 
 
 class _IStringable(object, metaclass=ABCMeta):
+    __slots__ = ()
 
     @abstractmethod
     def __str__(self) -> str:
@@ -25,9 +31,11 @@ class Singleton(ABCMeta):
     _instances = {}
 
     def __call__(cls, *args, **kwds):
-        if cls not in cls._instances:
-            cls._instances[cls] = super().__call__(*args, **kwds)
-        return cls._instances[cls]
+        # Repeat calls only return the existing instance, so that path costs a single dictionary lookup.
+        instance = cls._instances.get(cls)
+        if instance is None:
+            instance = cls._instances[cls] = super().__call__(*args, **kwds)
+        return instance
 
 
 class ProtectedClassVarsMeta(type):
@@ -35,14 +43,17 @@ class ProtectedClassVarsMeta(type):
     A metaclass that manages class variable assignments. When using this metaclass, any class variables type-hinted
     as ClassVar will only be assignable once. Any subsequent attempts to assign these variables will raise a TypeError.
     """
-    __class_vars: List[str] = []
+    __class_vars: FrozenSet[str] = frozenset()
 
     def __new__(metacls, cls, bases, classdict, **kwargs):
         result_class = super().__new__(metacls, cls, bases, classdict, **kwargs)
-        hints = get_type_hints(result_class)
-        for k, v in hints.items():
-            if get_origin(v) is ClassVar:
-                metacls.__class_vars.append(k)
+        # The protected names are inherited from the bases. Type hints are only resolved for a class that declares
+        # annotations of its own, so subclasses created on the fly without a body skip that work entirely. Under lazily
+        # evaluated annotations (PEP 649) the namespace holds `__annotate__` rather than `__annotations__`.
+        class_vars = set().union(*(getattr(base, '_ProtectedClassVarsMeta__class_vars', ()) for base in bases))
+        if '__annotations__' in classdict or '__annotate__' in classdict:
+            class_vars.update(k for k, v in get_type_hints(result_class).items() if get_origin(v) is ClassVar)
+        result_class.__class_vars = frozenset(class_vars)
         return result_class
 
     def __setattr__(self, __name, __value):
@@ -76,3 +87,41 @@ class FrozenList(list):
 
     def __delitem__(self, __i):
         raise AttributeError('List is frozen and cannot be modified.')
+
+
+_K = TypeVar('_K', bound=Hashable)
+
+
+class LRUCache(OrderedDict, Generic[_K, _T]):
+    """
+    An ordered dictionary holding at most `maxsize` entries. Reading an entry with `get` marks it as most recently used;
+    storing a new entry past capacity evicts the least recently used one, passing its value to `on_evict` if given.
+    `get` and item assignment are safe to call from several threads at once.
+    """
+
+    def __init__(self, maxsize: int, on_evict: Callable[[_T], None] = None) -> None:
+        super().__init__()
+        self.maxsize = maxsize
+        self.on_evict = on_evict
+        # Module-level caches are shared by every thread. Without the lock, another thread's eviction could remove a key
+        # between reading it and moving it to the end.
+        self._lock = threading.Lock()
+
+    def get(self, key: _K, default: _T = None) -> _T:
+        with self._lock:
+            try:
+                value = self[key]
+            except KeyError:
+                return default
+            self.move_to_end(key)
+            return value
+
+    def __setitem__(self, key: _K, value: _T) -> None:
+        with self._lock:
+            super().__setitem__(key, value)
+            self.move_to_end(key)
+            if len(self) <= self.maxsize:
+                return
+            _, evicted = self.popitem(last=False)
+        if self.on_evict is not None:
+            self.on_evict(evicted)